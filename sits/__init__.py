@@ -1,6 +1,21 @@
-
 __version__ = "0.7.5"
 __author__ = "Kenji Ose <kenji.ose@ec.europa.eu>"
-__all__ = []
+__all__ = ["sits", "export", "analysis", "smoothing", "layout"]
+
+import importlib
+
+
+def __getattr__(name):
+    """
+    Import the submodules on first access (PEP 562), so that ``import sits``
+    stays cheap, e.g. in worker processes that only need one submodule.
+    """
+    if name in __all__:
+        module = importlib.import_module(f".{name}", __name__)
+        globals()[name] = module
+        return module
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
-from . import sits, export, analysis
\ No newline at end of file
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -1,17 +1,19 @@
 import os
+import time
+import json
+import pickle
+import base64
+import socket
+import functools
 from datetime import datetime
 import xarray as xr
 import pandas as pd
 import numpy as np
-from scipy.ndimage import label
-from skimage.filters.rank import modal
-from skimage.morphology import square
-# sktime package
-from sktime.forecasting.base import ForecastingHorizon
-from sktime.registry import all_estimators
-# plotting
-import matplotlib.pyplot as plt
-from mpl_toolkits.axes_grid1 import make_axes_locatable
+import rioxarray  # noqa: F401
+import dask
+import dask.array as dask_array
+# sktime, scikit-image and matplotlib are imported where they are used:
+# they are slow to import and most workflows need only one of them
 
 
 def initialize_dask_client(n_cores=False, threads_per_worker=1):
@@ -159,6 +161,131 @@ def reindexTS(df, freq='D',
     return df
 
 
+def _reindex_plan(times, freq):
+    """
+    Index arithmetic of `xr_reindexTS`, shared by all the pixels.
+
+    Args:
+        times (np.ndarray): increasing dates (datetime64).
+        freq (str): daily or N-day frequency, e.g. 'D' or '5D'.
+
+    Returns:
+        tuple: dates of the regular grid (datetime64[ns]) and grid cell of
+            each input date, both as np.ndarray.
+    """
+    offset = pd.tseries.frequencies.to_offset(freq)
+    if not isinstance(offset, pd.offsets.Day):
+        raise ValueError(f"Invalid frequency '{freq}': only daily or N-day "
+                         "frequencies (e.g. 'D', '5D') are supported.")
+
+    days = np.asarray(times).astype('datetime64[D]').astype(np.int64)
+    cells = (days - days[0]) // offset.n
+    grid = days[0] + offset.n * np.arange(cells[-1] + 1)
+    return grid.astype('datetime64[D]').astype('datetime64[ns]'), cells
+
+
+def _regrid_block(arr, cells, n_cells, interpolate):
+    """
+    Average the dates of every grid cell and optionally fill the empty
+    cells by linear interpolation, time being the last axis.
+    """
+    shape = arr.shape[:-1]
+    y = np.asarray(arr, dtype=float).reshape(-1, arr.shape[-1])
+    valid = np.isfinite(y)
+
+    starts = np.flatnonzero(np.r_[True, np.diff(cells) > 0])
+    sums = np.add.reduceat(np.where(valid, y, 0.0), starts, axis=1)
+    counts = np.add.reduceat(valid, starts, axis=1, dtype=np.int64)
+    out = np.full((len(y), n_cells), np.nan)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        out[:, cells[starts]] = np.where(counts > 0, sums / counts, np.nan)
+
+    if interpolate:
+        grid = np.arange(n_cells, dtype=float)
+        out = _interp_valid(out, grid, grid)
+    return out.reshape(shape + (n_cells,))
+
+
+def xr_reindexTS(obj, freq='D', interpolate=False, method='linear', dim='time'):
+    """
+    Reindex the time series of a whole cube to a regular daily or N-day
+    grid, with optional interpolation.
+
+    Cube-level counterpart of `reindexTS`: the dates are normalized, the
+    values falling in the same grid cell are averaged (as with a pandas
+    resampling) and the empty cells are optionally filled. The grid is
+    computed once and applied to all the pixels of a chunk at once.
+
+    Args:
+        obj (xr.Dataset or xr.DataArray): time series ('time', 'y', 'x').
+        freq (str, optional): daily or N-day frequency of the grid, e.g.
+            'D' or '5D'. The grid starts at the first date. Defaults to 'D'.
+        interpolate (bool, optional): If True, fills the empty cells by
+            linear interpolation, and the cells before the first (after the
+            last) valid value with that value. Defaults to False.
+        method (str, optional): interpolation method. Only 'linear' is
+            vectorized; use `reindexTS` for the other pandas methods.
+            Defaults to 'linear'.
+        dim (str, optional): name of the time dimension. Defaults to 'time'.
+
+    Returns:
+        xr.Dataset or xr.DataArray: time series (float64) on the regular grid.
+
+    Raises:
+        ValueError: if `freq` is not a daily or N-day frequency, or if
+            `method` is not 'linear'.
+
+    Examples:
+        >>> ndvi_5d = xr_reindexTS(stacObj.indices, freq='5D', interpolate=True)
+    """
+    if method != 'linear':
+        raise ValueError(f"Invalid method '{method}': only 'linear' is supported.")
+
+    obj = obj.sortby(dim)
+    grid, cells = _reindex_plan(obj[dim].values, freq)
+    if obj.chunks:
+        obj = obj.chunk({dim: -1})
+
+    result = xr.apply_ufunc(
+        _regrid_block,
+        obj,
+        input_core_dims=[[dim]],
+        output_core_dims=[[dim]],
+        exclude_dims={dim},
+        kwargs={'cells': cells, 'n_cells': len(grid), 'interpolate': interpolate},
+        keep_attrs=True,
+        dask='parallelized',
+        dask_gufunc_kwargs={'output_sizes': {dim: len(grid)}},
+        output_dtypes=[float],
+    )
+    return result.assign_coords({dim: grid}).transpose(*obj.dims)
+
+
+@functools.lru_cache(maxsize=None)
+def _forecaster_registry():
+    """
+    Forecaster classes of the sktime registry, by name.
+
+    Crawling the registry is slow: it is done once per process.
+    """
+    from sktime.registry import all_estimators
+
+    return dict(all_estimators(estimator_types="forecaster"))
+
+
+def _forecaster_class(model_name):
+    forecaster_cls = _forecaster_registry().get(model_name)
+    if forecaster_cls is None:
+        raise ValueError(f"Model '{model_name}' not found in sktime registry.")
+    return forecaster_cls
+
+
+def _fit_predict(df, fh, forecaster_cls, model_params):
+    forecaster = forecaster_cls(**model_params)
+    forecaster.fit(df)
+    return forecaster.predict(fh).iloc[:, 0].values
+
+
 def sktime_fitpred(ts,
                    time_index,
                    predict_time,
@@ -199,7 +326,9 @@ def sktime_fitpred(ts,
     Examples:
         >>> predict = sktime_fitpred(arr_train, time_train, time_pred)
     """
+    from sktime.forecasting.base import ForecastingHorizon
 
+    forecaster_cls = _forecaster_class(model_name)
     fh = ForecastingHorizon(predict_time,
                             is_relative=False)
 
@@ -209,18 +338,425 @@ def sktime_fitpred(ts,
     reindex_params = reindex_params or {}
     df = reindexTS(df, freq=freq, **reindex_params)
 
-    # Get forecaster class by name
-    forecaster_cls = dict(
-        all_estimators(estimator_types="forecaster")).get(model_name)
+    return _fit_predict(df, fh, forecaster_cls, model_params or {})
 
-    if forecaster_cls is None:
-        raise ValueError(f"Model '{model_name}' not found in sktime registry.")
 
-    model_params = model_params or {}
-    forecaster = forecaster_cls(**model_params)
-    forecaster.fit(df)
+def _reindex_block(arr, time_index, freq, reindex_params):
+    """
+    Reindex every pixel of a block at once, time being the last axis.
+
+    Returns:
+        pd.DataFrame: one column per pixel.
+    """
+    df = pd.DataFrame(arr.reshape(-1, arr.shape[-1]).T, index=time_index)
+    return reindexTS(df, freq=freq, **reindex_params)
+
+
+def _forecast_block(arr, time_index, fh, forecaster_cls, model_params,
+                    freq, reindex_params):
+    """
+    Forecast every pixel of a block, time being the last axis.
+
+    The reindexing is done once for the whole block (one column per
+    pixel), so that only the model fit is left in the pixel loop.
+    """
+    df = _reindex_block(arr, time_index, freq, reindex_params)
+    out = np.empty((df.shape[1], len(fh)))
+    for k in range(df.shape[1]):
+        out[k] = _fit_predict(df.iloc[:, [k]].set_axis(['y'], axis=1),
+                              fh, forecaster_cls, model_params)
+    return out.reshape(arr.shape[:-1] + (len(fh),))
+
+
+def _fit_block(arr, time_index, forecaster_cls, model_params, freq,
+               reindex_params, width=None):
+    """
+    Fit a sktime model on every pixel of a block, time being the last axis.
+
+    Returns:
+        np.ndarray: fitted models, pickled and base64-encoded, as fixed-width
+            bytes of ``width`` characters (bytes objects if None).
+    """
+    df = _reindex_block(arr, time_index, freq, reindex_params)
+    out = np.empty(df.shape[1], dtype=object)
+    for k in range(df.shape[1]):
+        forecaster = forecaster_cls(**model_params)
+        forecaster.fit(df.iloc[:, [k]].set_axis(['y'], axis=1))
+        out[k] = base64.b64encode(pickle.dumps(forecaster))
+    if width is not None:
+        longest = max((len(m) for m in out), default=0)
+        if longest > width:
+            raise ValueError(f"A fitted model takes {longest} characters, more "
+                             f"than 'model_width' ({width}).")
+        out = out.astype(f'S{width}')
+    return out.reshape(arr.shape[:-1])
+
+
+def _predict_block(models, fh):
+    """Predict with the fitted models of `_fit_block`."""
+    flat = models.reshape(-1)
+    out = np.empty((len(flat), len(fh)))
+    for k, model in enumerate(flat):
+        forecaster = pickle.loads(base64.b64decode(model))
+        out[k] = forecaster.predict(fh).iloc[:, 0].values
+    return out.reshape(models.shape + (len(fh),))
+
+
+def _harmonic_design(t_days, degree=1, include_trend=True, period=365.25):
+    """
+    Design matrix of a constant, an optional linear trend and harmonics.
+
+    Args:
+        t_days (np.ndarray): dates in days.
+        degree (int, optional): number of harmonics. Defaults to 1.
+        include_trend (bool, optional): add a linear trend. Defaults to True.
+        period (float, optional): period of the first harmonic in days.
+            Defaults to 365.25.
+
+    Returns:
+        np.ndarray: design matrix of shape (len(t_days), n_coefs).
+    """
+    omega = 2 * np.pi / period
+    cols = [np.ones(len(t_days))]
+    if include_trend:
+        cols.append(t_days)
+    for d in range(1, degree + 1):
+        cols.append(np.cos(d * omega * t_days))
+        cols.append(np.sin(d * omega * t_days))
+    return np.column_stack(cols)
+
+
+def _masked_lstsq(y, X):
+    """
+    Least squares fits of many series sharing one design matrix.
+
+    Series without gaps are solved together with a single ``lstsq``; the
+    others through their normal equations, NaNs getting a zero weight.
+
+    Args:
+        y (np.ndarray): series of shape (pixels, n).
+        X (np.ndarray): design matrix of shape (n, n_coefs).
+
+    Returns:
+        np.ndarray: coefficients of shape (pixels, n_coefs), NaN for series
+            with fewer valid observations than coefficients.
+    """
+    n, k = X.shape
+    valid = np.isfinite(y)
+    coefs = np.full((len(y), k), np.nan)
+
+    complete = valid.all(axis=1)
+    if complete.any():
+        coefs[complete] = np.linalg.lstsq(X, y[complete].T, rcond=None)[0].T
+
+    rest = ~complete & (np.count_nonzero(valid, axis=1) >= k)
+    if rest.any():
+        w = valid[rest].astype(float)
+        lhs = (w @ (X[:, :, None] * X[:, None, :]).reshape(n, k * k)).reshape(-1, k, k)
+        rhs = np.where(valid[rest], y[rest], 0.0) @ X
+        try:
+            coefs[rest] = np.linalg.solve(lhs, rhs[..., None])[..., 0]
+        except np.linalg.LinAlgError:
+            coefs[rest] = (np.linalg.pinv(lhs) @ rhs[..., None])[..., 0]
+    return coefs
+
+
+def _interp_valid(y, t, t_new, t_knots=None):
+    """
+    Linear interpolation of many series, NaNs being ignored.
+
+    Values outside the valid observations of a series take the nearest
+    valid value, as with ``np.interp``.
+
+    Args:
+        y (np.ndarray): series of shape (pixels, n).
+        t (np.ndarray): increasing dates of shape (n,).
+        t_new (np.ndarray): dates to interpolate at.
+        t_knots (np.ndarray, optional): dates of shape (pixels, n) used
+            instead of ``t`` for the interpolation weights, when some dates
+            differ between pixels but keep the order of ``t``.
+
+    Returns:
+        np.ndarray: interpolated values of shape (pixels, len(t_new)), NaN
+            for series without valid observations.
+    """
+    n = len(t)
+    valid = np.isfinite(y)
+    idx = np.arange(n)
+    prev = np.maximum.accumulate(np.where(valid, idx, -1), axis=1)
+    nxt = np.minimum.accumulate(np.where(valid, idx, n)[:, ::-1], axis=1)[:, ::-1]
+
+    pos = np.searchsorted(t, t_new, side='right') - 1
+    left = np.where(pos >= 0, prev[:, np.clip(pos, 0, n - 1)], -1)
+    right = np.where(pos + 1 < n, nxt[:, np.clip(pos + 1, 0, n - 1)], n)
+    left_ok, right_ok = left >= 0, right < n
+    left, right = (np.where(left_ok, left, right).clip(0, n - 1),
+                   np.where(right_ok, right, left).clip(0, n - 1))
+
+    t_knots = np.broadcast_to(t, y.shape) if t_knots is None else t_knots
+    y_left = np.take_along_axis(y, left, axis=1)
+    y_right = np.take_along_axis(y, right, axis=1)
+    t_left = np.take_along_axis(t_knots, left, axis=1)
+    span = np.take_along_axis(t_knots, right, axis=1) - t_left
+    with np.errstate(invalid='ignore', divide='ignore'):
+        frac = np.where(span > 0, (t_new - t_left) / span, 0.0)
+    out = y_left + frac * (y_right - y_left)
+    out[~left_ok & ~right_ok] = np.nan
+    return out
+
+
+def harmonic_forecast(arr, t_days, predict_days, degree=1, include_trend=True,
+                      period=365.25):
+    """
+    Forecast many series with a trend plus harmonics regression.
+
+    All the series of the array are fitted at once (see
+    `SitsPlotter.plot_model` for the single pixel version).
+
+    Args:
+        arr (np.ndarray): time series, time being the last axis.
+        t_days (np.ndarray): dates of the series in days.
+        predict_days (np.ndarray): dates to predict, in days.
+        degree (int, optional): number of harmonics. Defaults to 1.
+        include_trend (bool, optional): add a linear trend. Defaults to True.
+        period (float, optional): period of the first harmonic in days.
+            Defaults to 365.25.
+
+    Returns:
+        np.ndarray: predictions, time being the last axis.
+
+    Example:
+        >>> pred = harmonic_forecast(ndvi_values, t_days, predict_days, degree=2)
+    """
+    params = _harmonic_fit(arr, t_days, degree, include_trend, period)
+    return _harmonic_predict(params, t_days, predict_days, degree,
+                             include_trend, period)
+
+
+def _harmonic_fit(arr, t_days, degree=1, include_trend=True, period=365.25):
+    """Coefficients of the harmonic regression, last axis."""
+    y = np.asarray(arr, dtype=float).reshape(-1, arr.shape[-1])
+    coefs = _masked_lstsq(y, _harmonic_design(t_days, degree, include_trend, period))
+    return coefs.reshape(arr.shape[:-1] + (-1,))
 
-    return forecaster.predict(fh)['y'].values
+
+def _harmonic_predict(params, t_days, predict_days, degree=1, include_trend=True,
+                      period=365.25):
+    return params @ _harmonic_design(predict_days, degree, include_trend, period).T
+
+
+def seasonal_naive_forecast(arr, t_days, predict_days, period=365.25):
+    """
+    Forecast many series with the value observed one season earlier.
+
+    A date is predicted by the series, linearly interpolated between its
+    valid observations, at the same date shifted by as many periods as
+    needed to fall within the last season of the fitted dates.
+
+    Args:
+        arr (np.ndarray): time series, time being the last axis.
+        t_days (np.ndarray): dates of the series in days.
+        predict_days (np.ndarray): dates to predict, in days.
+        period (float, optional): season length in days. Defaults to 365.25.
+
+    Returns:
+        np.ndarray: predictions, time being the last axis.
+
+    Example:
+        >>> pred = seasonal_naive_forecast(ndvi_values, t_days, predict_days)
+    """
+    params = _seasonal_naive_fit(arr, t_days, period)
+    return _seasonal_naive_predict(params, t_days, predict_days, period)
+
+
+def _seasonal_naive_fit(arr, t_days, period=365.25):
+    """
+    Last season of the series, last axis: the date and value of the last
+    valid observation before the season, then the values of the season.
+    """
+    start = np.searchsorted(t_days, t_days[-1] - period, side='right')
+    y = np.asarray(arr, dtype=float).reshape(-1, arr.shape[-1])
+    valid = np.isfinite(y[:, :start])
+    last = np.where(valid, np.arange(start), -1).max(axis=1, initial=-1)
+    found = last >= 0
+    before_date = np.where(found, t_days[last.clip(0)], np.nan)
+    before_value = np.where(found, y[np.arange(len(y)), last.clip(0)], np.nan)
+    params = np.column_stack([before_date, before_value, y[:, start:]])
+    return params.reshape(arr.shape[:-1] + (-1,))
+
+
+def _seasonal_naive_predict(params, t_days, predict_days, period=365.25):
+    shape = params.shape[:-1]
+    params = params.reshape(-1, params.shape[-1])
+    season = t_days[np.searchsorted(t_days, t_days[-1] - period, side='right'):]
+    knots = np.column_stack([params[:, 0],
+                             np.broadcast_to(season, (len(params), len(season)))])
+
+    predict_days = np.asarray(predict_days, dtype=float)
+    n_periods = np.ceil((predict_days - t_days[-1]) / period)
+    pred = _interp_valid(params[:, 1:], np.concatenate([[-np.inf], season]),
+                         predict_days - n_periods * period, t_knots=knots)
+    return pred.reshape(shape + (len(predict_days),))
+
+
+def exp_smoothing_forecast(arr, t_days, predict_days, alpha=0.3, beta=None):
+    """
+    Forecast many series with exponential smoothing.
+
+    Simple exponential smoothing, or Holt's linear trend method when
+    ``beta`` is given, run over the valid observations of every series at
+    once. The trend is expressed per day, so that irregular dates are
+    handled. The smoothing parameters are fixed, not optimized.
+
+    Args:
+        arr (np.ndarray): time series, time being the last axis.
+        t_days (np.ndarray): dates of the series in days.
+        predict_days (np.ndarray): dates to predict, in days.
+        alpha (float, optional): smoothing of the level. Defaults to 0.3.
+        beta (float, optional): smoothing of the trend. Defaults to None
+            (no trend).
+
+    Returns:
+        np.ndarray: predictions, time being the last axis.
+
+    Example:
+        >>> pred = exp_smoothing_forecast(ndvi_values, t_days, predict_days,
+        ...                               alpha=0.5, beta=0.1)
+    """
+    params = _exp_smoothing_fit(arr, t_days, alpha, beta)
+    return _exp_smoothing_predict(params, t_days, predict_days, alpha, beta)
+
+
+def _exp_smoothing_fit(arr, t_days, alpha=0.3, beta=None):
+    """Final level, trend and date of the smoothing, last axis."""
+    for name, value in (('alpha', alpha), ('beta', beta)):
+        if value is not None and not 0 < value <= 1:
+            raise ValueError(f"'{name}' must be in (0, 1].")
+
+    y = np.asarray(arr, dtype=float).reshape(-1, arr.shape[-1])
+    level = np.full(len(y), np.nan)
+    trend = np.zeros(len(y))
+    last = np.full(len(y), np.nan)
+
+    for j, t in enumerate(t_days):
+        obs = y[:, j]
+        valid = np.isfinite(obs)
+        start = valid & np.isnan(level)
+        level[start] = obs[start]
+        last[start] = t
+
+        upd = np.flatnonzero(valid & ~start)
+        dt = t - last[upd]
+        new_level = alpha * obs[upd] + (1 - alpha) * (level[upd] + dt * trend[upd])
+        if beta is not None:
+            with np.errstate(invalid='ignore', divide='ignore'):
+                slope = (new_level - level[upd]) / dt
+            trend[upd] = np.where(dt > 0, beta * slope + (1 - beta) * trend[upd],
+                                  trend[upd])
+        level[upd] = new_level
+        last[upd] = t
+
+    return np.stack([level, trend, last], axis=-1).reshape(arr.shape[:-1] + (3,))
+
+
+def _exp_smoothing_predict(params, t_days, predict_days, alpha=0.3, beta=None):
+    level, trend, last = params[..., 0:1], params[..., 1:2], params[..., 2:3]
+    return level + trend * (np.asarray(predict_days) - last)
+
+
+FORECASTERS = {
+    'harmonic': harmonic_forecast,
+    'seasonal_naive': seasonal_naive_forecast,
+    'exp_smoothing': exp_smoothing_forecast,
+}
+
+# fit and predict functions of the batched models, used to persist them
+_FIT_PREDICT = {
+    'harmonic': (_harmonic_fit, _harmonic_predict),
+    'seasonal_naive': (_seasonal_naive_fit, _seasonal_naive_predict),
+    'exp_smoothing': (_exp_smoothing_fit, _exp_smoothing_predict),
+}
+
+
+def _timed_block(func, block, kwargs, rows=None):
+    """
+    Run a forecast function on a block of pixels, timing it. With ``rows``,
+    the block is a whole chunk (pixels..., time) sliced on the worker.
+    """
+    if rows is not None:
+        block = block.reshape(-1, block.shape[-1])[rows]
+    start = time.perf_counter()
+    out = func(block, **kwargs)
+    return out, time.perf_counter() - start, f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _run_blocks(func, data, kwargs, executor, block_size):
+    """
+    Run a forecast function on the chunks of a dask array through an
+    executor, every chunk being split into blocks of pixels.
+
+    Chunks are read one after the other: a chunk is only loaded once the
+    blocks of the chunk before last are done, so that the driver never
+    holds the whole array. With a ``dask.distributed.Client``, chunks are
+    computed on the cluster and only the forecasts come back.
+
+    Args:
+        func (callable): forecast function, time being the last axis.
+        data (dask.array.Array): time series of shape (..., time), with a
+            single chunk along time.
+        kwargs (dict): keyword arguments of ``func``.
+        executor: object with a ``submit`` method returning futures, e.g. a
+            ``concurrent.futures`` executor or a ``dask.distributed.Client``.
+        block_size (int): number of pixels per block.
+
+    Returns:
+        tuple: nested list of the forecasts of every chunk, shaped as the
+            chunks of ``data`` (without time), and a pd.DataFrame of the
+            block timings.
+    """
+    distributed = hasattr(executor, 'compute') and hasattr(executor, 'gather')
+    delayed = data.to_delayed()[..., 0]
+    grid = list(np.ndindex(delayed.shape))
+
+    def submit(index):
+        n_pixels = int(np.prod([data.chunks[d][k] for d, k in enumerate(index)]))
+        starts = range(0, n_pixels, block_size)
+        if distributed:
+            chunk = executor.compute(delayed[index])
+            futures = [executor.submit(_timed_block, func, chunk, kwargs,
+                                       slice(i, i + block_size)) for i in starts]
+        else:
+            chunk = np.asarray(delayed[index].compute())
+            values = chunk.reshape(-1, chunk.shape[-1])
+            futures = [executor.submit(_timed_block, func, values[i:i + block_size], kwargs)
+                       for i in starts]
+        return index, n_pixels, starts, futures
+
+    outputs, records = {}, []
+
+    def collect(index, n_pixels, starts, futures):
+        results = [future.result() for future in futures]
+        shape = tuple(data.chunks[d][k] for d, k in enumerate(index))
+        outputs[index] = np.concatenate([r[0] for r in results]).reshape(shape + (-1,))
+        records.extend((index, i, min(block_size, n_pixels - i), r[1], r[2])
+                       for i, r in zip(starts, results))
+
+    pending = []
+    for index in grid:
+        pending.append(submit(index))
+        if len(pending) > 1:
+            collect(*pending.pop(0))
+    for item in pending:
+        collect(*item)
+
+    def nest(prefix):
+        if len(prefix) == delayed.ndim:
+            return [outputs[prefix]]  # single block along forecast time
+        return [nest(prefix + (k,)) for k in range(delayed.shape[len(prefix)])]
+
+    timings = pd.DataFrame(records, columns=['chunk', 'start', 'n_pixels',
+                                             'seconds', 'worker'])
+    return nest(()), timings
 
 
 def xr_forecast(dataarray,
@@ -228,14 +764,20 @@ def xr_forecast(dataarray,
                 model_name='ThetaForecaster',
                 model_params=None,
                 reindex_params=None,
-                freq='D'):
+                freq='D',
+                executor=None,
+                block_size=1024,
+                return_timings=False):
     """
-    Apply a sktime forecasting model to each pixel of a time series DataArray.
+    Apply a forecasting model to each pixel of a time series DataArray.
 
     This function performs pixel-wise time series forecasting on an
-    xarray.DataArray using a specified sktime model. It applies
-    the `sktime_fitpred` function across the spatial dimensions using
-    `xarray.apply_ufunc`, enabling parallelized computation with Dask.
+    xarray.DataArray, either with a batched model of `FORECASTERS`, which
+    fits all the pixels of a chunk at once, or with any sktime model (slow
+    but general). For sktime models, it applies the `sktime_fitpred` steps
+    across the spatial dimensions using `xarray.apply_ufunc`, enabling
+    parallelized computation with Dask. The forecaster class is looked up
+    once and the reindexing is done once per chunk for all its pixels.
 
     Args:
         dataarray(xr.DataArray): a 3D xarray DataArray with dimensions
@@ -243,44 +785,287 @@ def xr_forecast(dataarray,
             each pixel.
         predict_time (array-like): a list or array of future timestamps for
             which predictions are required.
-        model_name (str, optional): name of the sktime forecasting model to use.
-            Must be a valid forecaster registered in sktime.
+        model_name (str, optional): name of the forecasting model to use.
+            Either a batched model ('harmonic', 'seasonal_naive',
+            'exp_smoothing') or a valid forecaster registered in sktime.
             Default to 'ThetaForecaster'.
         model_params (dict, optional): dictionary of parameters to initialize
-            the forecasting model. If None, default parameters are used.
+            the forecasting model (keyword arguments of the function for
+            batched models, e.g. ``{'degree': 2}`` for 'harmonic'). If None,
+            default parameters are used.
         reindex_params (dict, optional): additional keyword arguments passed to
             the `reindexTS` function for time series reindexing.
         freq (str, optional): frequency string used to regularize the time index.
             Default to 'D' for daily.
+        executor (optional): runs blocks of pixels on processes instead of
+            the dask scheduler, which helps GIL-bound sktime models. Either
+            'processes' (a process pool over all the CPU cores) or any object
+            with a ``submit`` method, such as a
+            ``concurrent.futures.ProcessPoolExecutor`` or a
+            ``dask.distributed.Client``. Dask-backed DataArrays are read
+            chunk by chunk (rechunked to the full time series), and the
+            result keeps their spatial chunks. Defaults to None.
+        block_size (int, optional): number of pixels per block sent to the
+            executor, every chunk being split into such blocks.
+            Defaults to 1024.
+        return_timings (bool, optional): also return the timing of each
+            block (requires an executor). Defaults to False.
 
     Returns:
         result (xr.DataArray): a DataArray with dimensions ('time', 'y', 'x')
         containing the forecasted values for each pixel.
+        timings (pd.DataFrame): with `return_timings`, the chunk index,
+        first pixel within the chunk, number of pixels, duration in seconds
+        and worker of each block.
+
+    Raises:
+        ValueError: if `model_name` is neither a batched model nor found
+            in the sktime registry.
 
     Notes:
         - The function uses Dask for parallelized execution, making it suitable
         for large datasets.
         - The output time coordinate is replaced with `predict_time`.
+        - Batched models work on the original (irregular) dates and NaNs:
+        `reindex_params` and `freq` only apply to sktime models.
 
     Examples:
         >>> result = xr_forecast(dataarray, predict_time)
+        >>> result = xr_forecast(dataarray, predict_time, model_name='harmonic',
+        ...                      model_params={'degree': 2})
+        >>> result, timings = xr_forecast(dataarray, predict_time,
+        ...                               executor='processes', block_size=256,
+        ...                               return_timings=True)
     """
+    if return_timings and executor is None:
+        raise ValueError("'return_timings' requires an executor.")
+
     model_params = model_params or {}
 
+    if model_name in FORECASTERS:
+        ref = dataarray['time'].values[0]
+        func = FORECASTERS[model_name]
+        kwargs = {
+            "t_days": (dataarray['time'].values - ref) / np.timedelta64(1, 'D'),
+            "predict_days": (pd.DatetimeIndex(predict_time).values - ref)
+            / np.timedelta64(1, 'D'),
+            **model_params}
+    else:
+        from sktime.forecasting.base import ForecastingHorizon
+
+        func = _forecast_block
+        kwargs = {
+            "time_index": pd.DatetimeIndex(dataarray['time'].values),
+            "fh": ForecastingHorizon(predict_time, is_relative=False),
+            "forecaster_cls": _forecaster_class(model_name),
+            "model_params": model_params,
+            "freq": freq,
+            "reindex_params": reindex_params or {}}
+
+    if executor is not None:
+        arr = dataarray.transpose(..., 'time')
+        lazy = arr.chunks is not None
+        if lazy:
+            data = arr.data.rechunk({arr.ndim - 1: -1})
+        else:
+            data = dask_array.from_array(arr.values, chunks=-1)
+        if executor == 'processes':
+            from concurrent.futures import ProcessPoolExecutor
+
+            with ProcessPoolExecutor() as pool:
+                out, timings = _run_blocks(func, data, kwargs, pool, block_size)
+        else:
+            out, timings = _run_blocks(func, data, kwargs, executor, block_size)
+        out = dask_array.block(out) if lazy else np.block(out)
+        template = arr.isel(time=0, drop=True)
+        result = xr.DataArray(out, dims=template.dims + ('forecast_time',),
+                              coords=template.coords, attrs=dataarray.attrs)
+    else:
+        if dataarray.chunks:
+            dataarray = dataarray.chunk({'time': -1})
+
+        result = xr.apply_ufunc(
+            func,
+            dataarray,
+            input_core_dims=[['time']],
+            output_core_dims=[['forecast_time']],
+            keep_attrs=True,
+            kwargs=kwargs,
+            dask='parallelized',
+            dask_gufunc_kwargs={
+                'output_sizes': {'forecast_time': len(predict_time)}
+            },
+            output_dtypes=[float]
+        )
+
+    result = result.rename({"forecast_time": "time"})
+    result = result.assign_coords(time=("time", predict_time))
+    result = result.transpose('time', 'y', 'x')
+
+    if return_timings:
+        return result, timings
+    return result
+
+
+def xr_fit(dataarray,
+           model_name='ThetaForecaster',
+           model_params=None,
+           reindex_params=None,
+           freq='D',
+           path=None,
+           model_width=None):
+    """
+    Fit a forecasting model to each pixel of a time series DataArray and
+    keep the fitted models, so that new horizons can be predicted with
+    `xr_predict` without refitting.
+
+    Batched models (see `FORECASTERS`) are stored compactly as a few
+    parameters per pixel ('params' variable, along a 'param' dimension).
+    sktime models are stored as one pickled, base64-encoded model per pixel
+    ('model' variable), as fixed-width bytes so that the store is written
+    chunk by chunk.
+
+    Args:
+        dataarray(xr.DataArray): a 3D xarray DataArray with dimensions
+            ('time', 'y', 'x'), representing the time series data for
+            each pixel.
+        model_name (str, optional): name of the forecasting model, as in
+            `xr_forecast`. Default to 'ThetaForecaster'.
+        model_params (dict, optional): parameters of the forecasting model,
+            as in `xr_forecast`.
+        reindex_params (dict, optional): additional keyword arguments passed to
+            the `reindexTS` function (sktime models only).
+        freq (str, optional): frequency string used to regularize the time
+            index (sktime models only). Default to 'D' for daily.
+        path (str, optional): output path of the fitted models, NetCDF if it
+            ends with '.nc', Zarr otherwise. The returned dataset is then
+            opened lazily from the store. Defaults to None (not written).
+        model_width (int, optional): number of characters of a stored sktime
+            model. Defaults to None, i.e. the size of a model fitted on a
+            probe series, plus a margin.
+
+    Returns:
+        xr.Dataset: fitted models, with the model name, its parameters and
+            the fitted dates as attributes.
+
+    Raises:
+        ValueError: if `model_name` is neither a batched model nor found
+            in the sktime registry, or if a fitted sktime model is longer
+            than `model_width`.
+
+    Notes:
+        - Stored sktime models are unpickled by `xr_predict`: only open
+          stores from a trusted source.
+
+    Examples:
+        >>> models = xr_fit(dataarray, model_name='harmonic',
+        ...                 model_params={'degree': 2}, path='models.zarr')
+        >>> result = xr_predict('models.zarr', predict_time)
+    """
+    model_params = model_params or {}
+    ref = dataarray['time'].values[0]
+    t_days = (dataarray['time'].values - ref) / np.timedelta64(1, 'D')
+
+    if dataarray.chunks:
+        dataarray = dataarray.chunk({'time': -1})
+
+    if model_name in _FIT_PREDICT:
+        fit = _FIT_PREDICT[model_name][0]
+        n_params = fit(np.full((1, len(t_days)), np.nan), t_days,
+                       **model_params).shape[-1]
+        ds = xr.apply_ufunc(
+            fit,
+            dataarray,
+            input_core_dims=[['time']],
+            output_core_dims=[['param']],
+            kwargs={"t_days": t_days, **model_params},
+            dask='parallelized',
+            dask_gufunc_kwargs={'output_sizes': {'param': n_params}},
+            output_dtypes=[float]
+        ).to_dataset(name='params')
+    else:
+        kwargs = {
+            "time_index": pd.DatetimeIndex(dataarray['time'].values),
+            "forecaster_cls": _forecaster_class(model_name),
+            "model_params": model_params,
+            "freq": freq,
+            "reindex_params": reindex_params or {}}
+        if model_width is None:
+            # models of a series on the same dates have about the same size
+            probe = _fit_block(np.linspace(1, 2, len(t_days))[None], **kwargs)
+            model_width = int(len(probe[0]) * 1.25) + 256
+        ds = xr.apply_ufunc(
+            _fit_block,
+            dataarray,
+            input_core_dims=[['time']],
+            kwargs={**kwargs, "width": model_width},
+            dask='parallelized',
+            output_dtypes=[f'S{model_width}']
+        ).to_dataset(name='model')
+
+    ds.attrs = {'model_name': model_name,
+                'model_params': json.dumps(model_params, default=str),
+                'reference_time': str(ref),
+                'fit_days': t_days}
+
+    if path is not None:
+        if path.endswith('.nc'):
+            ds.to_netcdf(path)
+            ds = xr.open_dataset(path, chunks={}, decode_coords='all')
+        else:
+            ds.to_zarr(path, mode='w')
+            ds = xr.open_zarr(path, decode_coords='all')
+    return ds
+
+
+def xr_predict(models, predict_time):
+    """
+    Predict new dates with the fitted models of `xr_fit`.
+
+    Args:
+        models (xr.Dataset or str): fitted models (see `xr_fit`) or path
+            of the NetCDF file or Zarr store holding them.
+        predict_time (array-like): a list or array of timestamps for which
+            predictions are required.
+
+    Returns:
+        result (xr.DataArray): a DataArray with dimensions ('time', 'y', 'x')
+        containing the forecasted values for each pixel.
+
+    Examples:
+        >>> result = xr_predict('models.zarr', predict_time)
+    """
+    if not isinstance(models, xr.Dataset):
+        if str(models).endswith('.nc'):
+            models = xr.open_dataset(models, chunks={}, decode_coords='all')
+        else:
+            models = xr.open_zarr(models, decode_coords='all')
+
+    attrs = models.attrs
+    ref = np.datetime64(attrs['reference_time'])
+
+    if 'params' in models:
+        predict = _FIT_PREDICT[attrs['model_name']][1]
+        func, arr, core_dims = predict, models['params'], ['param']
+        kwargs = {
+            "t_days": np.atleast_1d(attrs['fit_days']),
+            "predict_days": (pd.DatetimeIndex(predict_time).values - ref)
+            / np.timedelta64(1, 'D'),
+            **json.loads(attrs['model_params'])}
+        if arr.chunks:
+            arr = arr.chunk({'param': -1})
+    else:
+        from sktime.forecasting.base import ForecastingHorizon
+
+        func, arr, core_dims = _predict_block, models['model'], []
+        kwargs = {"fh": ForecastingHorizon(predict_time, is_relative=False)}
+
     result = xr.apply_ufunc(
-        sktime_fitpred,
-        dataarray,
-        dataarray['time'],
-        input_core_dims=[['time'], ['time']],
+        func,
+        arr,
+        input_core_dims=[core_dims],
         output_core_dims=[['forecast_time']],
-        keep_attrs=True,
-        kwargs={
-            "predict_time": predict_time,
-            "model_name": model_name,
-            "model_params": model_params,
-            "reindex_params": reindex_params,
-            "freq": freq},
-        vectorize=True,
+        kwargs=kwargs,
         dask='parallelized',
         dask_gufunc_kwargs={
             'output_sizes': {'forecast_time': len(predict_time)}
@@ -290,9 +1075,325 @@ def xr_forecast(dataarray,
 
     result = result.rename({"forecast_time": "time"})
     result = result.assign_coords(time=("time", predict_time))
-    result = result.transpose('time', 'y', 'x')
+    return result.transpose('time', 'y', 'x')
 
-    return result
+
+def _harmonic_regression_block(arr, t_days, degree, include_trend, period,
+                               quantiles):
+    """
+    Harmonic regression of every pixel of a block, time being the last axis.
+
+    Returns:
+        tuple: coefficients, RMSE and residual quantiles.
+    """
+    shape = arr.shape[:-1]
+    y = np.asarray(arr, dtype=float).reshape(-1, arr.shape[-1])
+    X = _harmonic_design(t_days, degree, include_trend, period)
+    coefs = _masked_lstsq(y, X)
+    res = y - coefs @ X.T
+
+    fitted = np.isfinite(coefs[:, 0])
+    n_valid = np.count_nonzero(np.isfinite(res), axis=1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        rmse = np.sqrt(np.nansum(res ** 2, axis=1) / n_valid)
+    rmse[~fitted] = np.nan
+    q = np.full((len(y), len(quantiles)), np.nan)
+    if fitted.any():
+        q[fitted] = np.nanquantile(res[fitted], quantiles, axis=1).T
+
+    return (coefs.reshape(shape + (-1,)), rmse.reshape(shape),
+            q.reshape(shape + (len(quantiles),)))
+
+
+def harmonic_regression(dataarray,
+                        degree=1,
+                        include_trend=True,
+                        period=365.25,
+                        quantiles=(0.25, 0.75),
+                        dim='time'):
+    """
+    Fit a trend plus harmonics model to every pixel of a time series cube.
+
+    Same model as `SitsPlotter.plot_model`, fitted for all the pixels of a
+    chunk in one batched least squares solve: the pixels share the design
+    matrix, and NaNs are masked per pixel through the normal equations.
+
+    Args:
+        dataarray (xr.DataArray): time series ('time', 'y', 'x').
+        degree (int, optional): number of harmonics. Defaults to 1.
+        include_trend (bool, optional): add a linear trend. Defaults to True.
+        period (float, optional): period of the first harmonic in days.
+            Defaults to 365.25.
+        quantiles (tuple[float], optional): quantiles of the residuals.
+            Defaults to (0.25, 0.75).
+        dim (str, optional): name of the time dimension. Defaults to 'time'.
+
+    Returns:
+        xr.Dataset: the coefficients ('params', along a 'param' dimension
+            labelled 'intercept', 'trend', 'cos1', 'sin1', ...), the RMSE
+            ('rmse') and the residual quantiles ('residual_quantile') of
+            each pixel, NaN for pixels with fewer valid observations than
+            coefficients. Time is counted in days from the first date. The
+            dataset can be passed to `xr_predict`, e.g. for gap-filling.
+
+    Example:
+        >>> model = harmonic_regression(stacObj.indices['NDVI'], degree=2)
+        >>> ndvi_filled = stacObj.indices['NDVI'].fillna(
+        ...     xr_predict(model, stacObj.indices.time.values))
+    """
+    model_params = {'degree': degree, 'include_trend': include_trend,
+                    'period': period}
+    ref = dataarray[dim].values[0]
+    t_days = (dataarray[dim].values - ref) / np.timedelta64(1, 'D')
+    labels = ['intercept'] + ['trend'] * include_trend
+    for d in range(1, degree + 1):
+        labels += [f'cos{d}', f'sin{d}']
+
+    if dataarray.chunks:
+        dataarray = dataarray.chunk({dim: -1})
+
+    coefs, rmse, q = xr.apply_ufunc(
+        _harmonic_regression_block,
+        dataarray,
+        input_core_dims=[[dim]],
+        output_core_dims=[['param'], [], ['quantile']],
+        kwargs={'t_days': t_days, 'quantiles': list(quantiles), **model_params},
+        dask='parallelized',
+        dask_gufunc_kwargs={'output_sizes': {'param': len(labels),
+                                             'quantile': len(quantiles)}},
+        output_dtypes=[float, float, float],
+    )
+
+    ds = xr.Dataset({'params': coefs, 'rmse': rmse, 'residual_quantile': q})
+    ds = ds.assign_coords(param=labels, quantile=list(quantiles))
+    ds.attrs = {'model_name': 'harmonic',
+                'model_params': json.dumps(model_params),
+                'reference_time': str(ref),
+                'fit_days': t_days}
+    return ds
+
+
+def _cumulative_tables(values):
+    """
+    Cumulative tables of a time series array, time being the first axis.
+
+    Args:
+        values (np.ndarray): time series of shape (time, pixels).
+
+    Returns:
+        tuple: cumulative sums and counts of the valid values, both of shape
+            (time + 1, pixels) and starting with zeros, and the time index of
+            each valid value ranked along time, of shape (time, pixels).
+    """
+    valid = np.isfinite(values)
+    cumsum = np.zeros((values.shape[0] + 1,) + values.shape[1:])
+    np.cumsum(np.where(valid, values, 0.0), axis=0, out=cumsum[1:])
+    cumcount = np.zeros(cumsum.shape, dtype=np.int64)
+    np.cumsum(valid, axis=0, out=cumcount[1:])
+
+    positions = np.full(values.shape, values.shape[0] - 1, dtype=np.int64)
+    t_idx, px_idx = np.nonzero(valid)
+    positions[cumcount[1:][t_idx, px_idx] - 1, px_idx] = t_idx
+    return cumsum, cumcount, positions
+
+
+def _window_means(tables, pivots, bounds, min_obs, direction):
+    """
+    Means of the backward or forward windows of a batch of pivot dates.
+
+    Windows holding fewer than ``min_obs`` valid observations are extended
+    (away from the pivot date) to the ``min_obs`` closest valid observations.
+
+    Args:
+        tables (tuple): output of ``_cumulative_tables``.
+        pivots (np.ndarray): time indices of the pivot dates.
+        bounds (np.ndarray): time indices of the other end of the windows.
+        min_obs (int): minimum number of valid observations.
+        direction (str): 'backward' or 'forward'.
+
+    Returns:
+        tuple: means and in-range masks (fixed window holding at least
+            ``min_obs`` valid observations), both of shape (pivots, pixels).
+    """
+    cumsum, cumcount, positions = tables
+    if direction == "backward":
+        lo, hi = bounds, pivots
+    else:
+        lo, hi = pivots, bounds
+    count = cumcount[hi + 1] - cumcount[lo]
+    inrange = count >= min_obs
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = (cumsum[hi + 1] - cumsum[lo]) / count
+
+    short = ~inrange
+    if short.any() and min_obs > 0:
+        # rank of the min_obs-th valid observation away from the pivot
+        if direction == "backward":
+            rank = cumcount[pivots + 1] - min_obs
+            found = rank >= 0
+        else:
+            rank = cumcount[pivots] + min_obs - 1
+            found = rank < cumcount[-1]
+        rank = np.clip(rank, 0, positions.shape[0] - 1)
+        end = np.take_along_axis(positions, rank, axis=0)
+        if direction == "backward":
+            total = cumsum[pivots + 1] - np.take_along_axis(cumsum, end, axis=0)
+        else:
+            total = np.take_along_axis(cumsum, end + 1, axis=0) - cumsum[pivots]
+        mean = np.where(short, np.where(found, total / min_obs, np.nan), mean)
+
+    return mean, inrange
+
+
+FLAG_ANOMALY = 1
+FLAG_INRANGE = 2
+
+
+def _clearcut_block(values, times, pivots, lo_back, hi_forw, thresholds,
+                    anomaly_type, min_obs_backward, min_obs_forward,
+                    store_magnitude, magnitude_sparse, date_dtype):
+    """
+    ClearCut detection on a block of pixel time series.
+
+    Args:
+        values (np.ndarray): time series, time being the last axis.
+        times (np.ndarray): dates (datetime64) of the time axis.
+        pivots (np.ndarray): time indices of the pivot dates.
+        lo_back (np.ndarray): time index of the start of the backward window
+            of each date.
+        hi_forw (np.ndarray): time index of the end of the forward window
+            of each date.
+        thresholds (list): anomaly thresholds (the first one flags anomalies).
+        anomaly_type (str): 'absolute', 'drop' or 'increase'.
+        min_obs_backward (int): minimum number of valid observations in the
+            backward window.
+        min_obs_forward (int): minimum number of valid observations in the
+            forward window.
+        store_magnitude (bool): also return the magnitude of every pivot date.
+        magnitude_sparse (bool): keep only the magnitudes flagged as
+            anomalies (NaN elsewhere).
+        date_dtype (np.dtype): integer type of the dates, its minimum value
+            being the nodata value.
+
+    Returns:
+        tuple: first, max and last magnitudes (float32) and dates (days
+            since epoch), flags (see ``FLAG_ANOMALY``), position of the first pending pivot date (forward
+            mean still unknown while the backward mean is known, i.e. the
+            result may change with later dates; ``len(pivots)`` if none)
+            and, if ``store_magnitude``, the magnitudes (pivot dates being
+            the last axis).
+    """
+    shape = values.shape[:-1]
+    values = np.asarray(values, dtype=float)
+    values = values.reshape(int(np.prod(shape)), len(times)).T
+    n_pixels = values.shape[1]
+    days = (times - np.datetime64('1970-01-01')) // np.timedelta64(1, 'D')
+
+    tables = _cumulative_tables(values)
+
+    first_mag = np.full(n_pixels, np.nan)
+    first_date = np.full(n_pixels, np.nan)
+    max_mag = np.full(n_pixels, np.nan)
+    max_date = np.full(n_pixels, np.nan)
+    last_mag = np.full(n_pixels, np.nan)
+    last_date = np.full(n_pixels, np.nan)
+    in_range = np.zeros(n_pixels, dtype=bool)
+    pending = np.full(n_pixels, len(pivots), dtype=np.int64)
+    if store_magnitude:
+        # filled batch by batch, pivot dates last as in the output
+        mags = np.empty((n_pixels, len(pivots)), dtype=np.float32)
+
+    # pivots are processed in batches to bound the temporaries
+    batch_size = max(1, 2 ** 21 // max(n_pixels, 1))
+    cols = np.arange(n_pixels)
+    for start in range(0, len(pivots), batch_size):
+        batch = pivots[start:start + batch_size]
+        mean_before, inrange_b = _window_means(tables, batch, lo_back[batch],
+                                               min_obs_backward, 'backward')
+        mean_after, inrange_f = _window_means(tables, batch, hi_forw[batch],
+                                              min_obs_forward, 'forward')
+
+        # Calculate signed magnitude
+        mag = mean_after - mean_before
+
+        # --- Anomaly filtering logic ---
+        with np.errstate(invalid='ignore'):
+            if anomaly_type == "drop":
+                mask = mag < thresholds[0]
+            elif anomaly_type == "increase":
+                mask = mag > thresholds[0]
+            else:  # absolute
+                mask = abs(mag) > thresholds[0]
+        found = mask.any(axis=0)
+
+        if store_magnitude:
+            mags[:, start:start + len(batch)] = (
+                np.where(mask, mag, np.nan) if magnitude_sparse else mag).T
+
+        # First anomaly
+        idx = mask.argmax(axis=0)
+        new = found & np.isnan(first_mag)
+        first_mag[new] = mag[idx, cols][new]
+        first_date[new] = days[batch][idx][new]
+
+        # Max anomaly
+        score = np.where(mask, abs(mag), -np.inf)
+        idx = score.argmax(axis=0)
+        with np.errstate(invalid='ignore'):
+            new = found & ((score[idx, cols] > abs(max_mag)) | np.isnan(max_mag))
+        max_mag[new] = mag[idx, cols][new]
+        max_date[new] = days[batch][idx][new]
+
+        # Last anomaly
+        idx = len(batch) - 1 - mask[::-1].argmax(axis=0)
+        last_mag[found] = mag[idx, cols][found]
+        last_date[found] = days[batch][idx][found]
+
+        in_range |= (inrange_b | inrange_f).any(axis=0)
+
+        # pending pivots are a suffix: the first one is enough
+        unknown = ~np.isnan(mean_before) & np.isnan(mean_after)
+        new = unknown.any(axis=0) & (pending == len(pivots))
+        pending[new] = start + unknown.argmax(axis=0)[new]
+
+    def to_days(arr):
+        out = np.full(shape, np.iinfo(date_dtype).min, dtype=date_dtype)
+        found = ~np.isnan(arr)
+        out.reshape(-1)[found] = arr[found]
+        return out
+
+    flags = (~np.isnan(first_mag) * FLAG_ANOMALY
+             | in_range * FLAG_INRANGE).astype(np.uint8)
+    outputs = (first_mag.reshape(shape).astype(np.float32), to_days(first_date),
+               max_mag.reshape(shape).astype(np.float32), to_days(max_date),
+               last_mag.reshape(shape).astype(np.float32), to_days(last_date),
+               flags.reshape(shape), pending.reshape(shape))
+    if store_magnitude:
+        outputs += (mags.reshape(shape + (len(pivots),)),)
+    return outputs
+
+
+def _last_valid(values, n):
+    """
+    Last valid values of time series, time being the last axis.
+
+    Args:
+        values (np.ndarray): time series.
+        n (int): number of values to keep.
+
+    Returns:
+        np.ndarray: the ``n`` last valid values in time order, NaN-padded
+            at the start, with shape ``values.shape[:-1] + (n,)``.
+    """
+    shape = values.shape[:-1]
+    values = np.asarray(values, dtype=float).reshape(int(np.prod(shape)),
+                                                     values.shape[-1])
+    valid = np.isfinite(values)
+    rank = np.cumsum(valid[:, ::-1], axis=1)[:, ::-1]
+    px, t = np.nonzero(valid & (rank <= n))
+    out = np.full((values.shape[0], n), np.nan)
+    out[px, n - rank[px, t]] = values[px, t]
+    return out.reshape(shape + (n,))
 
 
 class ClearCut:
@@ -313,6 +1414,9 @@ class ClearCut:
 
     Attributes:
         da (xr.Dataarray): index time series ('time', 'band', 'y', 'x')
+        params (dict): parameters of the last detection.
+        state (xr.Dataset): per-pixel state to resume the detection with
+            later dates (see ``ClearCut.get_state`` and ``ClearCut.update``).
 
     Args:
         da (xr.Dataarray): index time series ('time', 'band', 'y', 'x')
@@ -323,6 +1427,8 @@ class ClearCut:
 
     def __init__(self, da: xr.DataArray):
         self.da = da
+        self.state = None
+        self.__last_run = None
 
     def season_of_interest(self, start: str = "06-01", end: str = "08-31", compute=True):
         """
@@ -347,49 +1453,17 @@ class ClearCut:
         else:
             self.da = self.da.sel(time=self.da['time'][mask])
 
-    def __select_window(self, pivot_date, window: int, direction: str):
-        d = np.datetime64(pivot_date)
-        if direction == "forward":
-            return self.da.sel(time=slice(d, d + np.timedelta64(window, 'D')))
-        elif direction == "backward":
-            return self.da.sel(time=slice(d - np.timedelta64(window, 'D'), d))
-        else:
-            raise ValueError("direction must be 'forward' or 'backward'")
-
-    def __compute_mean_and_mask(self, da_sub: xr.DataArray, min_obs: int):
-        valid_count = da_sub.notnull().sum(dim='time')
-        mean_fixed = da_sub.mean(dim='time', skipna=True)
-        mask = valid_count >= min_obs
-        return mean_fixed.where(mask), mask
-
-    def __extend_window(self, result: xr.DataArray, mask: xr.DataArray, start, end, min_obs: int, direction: str):
-        if direction == "forward":
-            time_iter = self.da.time.sel(time=slice(end, None))
-            slice_fn = lambda t: slice(end, t)
-        else:  # backward
-            time_iter = self.da.time.sel(time=slice(None, start))[::-1]
-            slice_fn = lambda t: slice(t, start)
-
-        for t in time_iter:
-            da_sub = self.da.sel(time=slice_fn(t.values))
-            valid_count = da_sub.notnull().sum(dim='time')
-            new_mask = (valid_count >= min_obs) & result.isnull()
-            result = result.where(~new_mask, da_sub.mean(dim='time', skipna=True))
-            if new_mask.sum() == 0:
-                break
-        return result
-
-    def __mean_with_fallback(self, pivot_date, window: int, direction: str = 'forward', min_obs: int = 2):
-        da_sub = self.__select_window(pivot_date, window, direction)
-        start, end = da_sub['time'].min().values, da_sub['time'].max().values
-        result, mask = self.__compute_mean_and_mask(da_sub, min_obs)
-        result = self.__extend_window(result, mask, start, end, min_obs, direction)
-        return result, mask
-
     def __classify_anomalies(self, mag_layer: xr.DataArray, thresholds: list):
-        class_layer = xr.full_like(mag_layer, 0, dtype=int)
-        for i, th in enumerate(thresholds, start=1):
-            class_layer = xr.where(abs(mag_layer) > abs(th), i, class_layer)
+        bins = np.sort(np.abs(thresholds))
+
+        def classify(mag):
+            # class i: the i smallest absolute thresholds are exceeded
+            with np.errstate(invalid='ignore'):
+                classes = np.digitize(np.abs(mag), bins, right=True)
+            return np.where(np.isnan(mag), 0, classes).astype(np.uint8)
+
+        class_layer = xr.apply_ufunc(classify, mag_layer, dask='parallelized',
+                                     output_dtypes=[np.uint8])
         class_layer.name = "anomaly_class"
         class_layer.attrs["thresholds"] = str(thresholds)
         return class_layer
@@ -402,7 +1476,9 @@ class ClearCut:
                          min_obs_backward: int = 5,
                          min_obs_forward: int = 2,
                          out_crs: str = "epsg:3035",
-                         store_magnitude: bool = False):
+                         store_magnitude: bool | str = False,
+                         magnitude_sparse: bool = False,
+                         date_dtype: str = "int16"):
         """
         Detect anomalies in a univariate time series (e.g., spectral indices such as NDVI)
         by comparing values between backward and forward moving windows.
@@ -435,101 +1511,155 @@ class ClearCut:
                 required in the forward window. Defaults to 2.
             out_crs (str, optional): Coordinate Reference System (CRS) to assign
                 to the output dataset. Defaults to "epsg:3035".
-            store_magnitude (bool, optional): Export of the magnitude timeseries.
-                Defaults to False.
+            store_magnitude (bool or str, optional): Export of the magnitude
+                timeseries. Defaults to False.
+                - True: ``ClearCut.magnitude_ts`` (lazy for dask inputs).
+                - path ending with '.nc' or '.zarr': the magnitudes and the
+                  detection are written chunk by chunk to a NetCDF file or a
+                  Zarr store, and ``ClearCut.magnitude_ts`` and
+                  ``ClearCut.detection`` are opened lazily from it.
+            magnitude_sparse (bool, optional): store only the magnitudes
+                flagged as anomalies (``thresholds[0]``), NaN elsewhere, which
+                compresses well on disk. Defaults to False.
+            date_dtype (str, optional): integer type of the dates, 'int16'
+                (up to 2059) or 'int32'. Defaults to 'int16'.
 
         Returns:
             ClearCut.detection (xr.Dataset):
                 Results are stored with the following variables:
-                - magnitude_first (float): Magnitude of the first anomaly detected.
-                - date_first (Unix epoch): Date (days since epoch) of the first anomaly.
-                - magnitude_max (float): Maximum anomaly magnitude detected.
-                - date_max (Unix epoch): Date of the maximum anomaly.
-                - magnitude_last (float): Magnitude of the last anomaly detected.
-                - date_last (Unix epoch): Date of the last anomaly.
-                - mask (binary): Boolean mask indicating anomaly presence.
-                - inrange (binary): Boolean mask indicating whether sufficient observations were available in both windows.
-                - classif (int): Classification layer based on thresholds.
+                - magnitude_first (float32): Magnitude of the first anomaly detected.
+                - date_first (int16): Date (days since epoch) of the first anomaly.
+                - magnitude_max (float32): Maximum anomaly magnitude detected.
+                - date_max (int16): Date of the maximum anomaly.
+                - magnitude_last (float32): Magnitude of the last anomaly detected.
+                - date_last (int16): Date of the last anomaly.
+                - flags (uint8): bit field, ``FLAG_ANOMALY`` (1) set where an
+                  anomaly is detected, ``FLAG_INRANGE`` (2) set where
+                  sufficient observations were available in both windows.
+                - classif (uint8): Classification layer based on thresholds.
             ClearCut.magnitude_ts (xr.Dataarray, optional): datacube of magnitudes
 
         Notes:
-            - Dates are stored as integer days since 1970-01-01.
-            - The classification is performed using the maximum anomaly magnitude compared against the provided thresholds.
+            - Dates are stored as integer days since 1970-01-01, the minimum
+              value of ``date_dtype`` (``nodata`` attribute) meaning no anomaly.
+            - e.g. anomaly mask: ``(detection.flags & FLAG_ANOMALY) > 0``.
+            - A window holding fewer valid observations than required is
+              extended, away from the pivot date, to the closest valid
+              observations (``inrange`` still refers to the fixed windows).
+            - The window sums and counts of all pivot dates are obtained from
+              cumulative sums along time, in O(T) operations per pixel.
+            - Dask-backed time series are processed lazily, one spatial
+              chunk at a time (time is rechunked into a single chunk), so
+              ``ClearCut.detection`` is a lazy dataset to compute or write.
+            - The classification is performed using the maximum anomaly magnitude compared against the provided thresholds:
+              class i when it exceeds the i smallest absolute thresholds.
             - The output dataset is tagged with the specified CRS for spatial consistency in geospatial workflows.
 
         Example:
             >>> ndvi_ts.detect_anomalies()
     """
 
-        da_window = self.da.sel(
-            time=slice(
-                self.da['time'].min().values + np.timedelta64(window_backward, 'D'),
-                self.da['time'].max().values - np.timedelta64(window_forward, 'D')
-            ))
-
-        time = da_window['time'].values
-        first_mag = xr.full_like(self.da.isel(time=0), np.nan)
-        first_date = xr.full_like(self.da.isel(time=0), np.nan)
-        max_mag = xr.full_like(self.da.isel(time=0), np.nan)
-        max_date = xr.full_like(self.da.isel(time=0), np.nan)
-        last_mag = xr.full_like(self.da.isel(time=0), np.nan)
-        last_date = xr.full_like(self.da.isel(time=0), np.nan)
-        in_range = xr.full_like(self.da.isel(time=0), False, dtype=bool)
-
-        mag_list = [] if store_magnitude else None
-
-        for d in time:
-            mean_before, inrange_b = self.__mean_with_fallback(pivot_date = d,
-                                                               window = window_backward,
-                                                               direction='backward',
-                                                               min_obs = min_obs_backward)
-            mean_after, inrange_f = self.__mean_with_fallback(pivot_date = d,
-                                                              window = window_forward,
-                                                              direction='forward',
-                                                              min_obs = min_obs_forward)
-
-            # Calculate signed magnitude
-            mag = mean_after - mean_before
-
-            if store_magnitude:
-                mag_list.append(mag.assign_coords(time=d))
-                self.magnitude_ts = xr.concat(mag_list, dim='time')
-
-            # --- Anomaly filtering logic ---
-            if anomaly_type == "drop":
-                mask = mag < thresholds[0]
-            elif anomaly_type == "increase":
-                mask = mag > thresholds[0]
-            else: # absolute
-                mask = abs(mag) > thresholds[0]
-
-            # First anomaly
-            first_mask = mask & np.isnan(first_mag)
-            first_mag = first_mag.where(~first_mask, mag)
-            first_date = first_date.where(~first_mask,
-                                  (pd.Timestamp(d) - pd.Timestamp("1970-01-01")) // pd.Timedelta(days=1),
-                                  )
-
-            # Max anomaly
-            max_mask = mask & ((abs(mag) > abs(max_mag)) | np.isnan(max_mag))
-            max_mag = max_mag.where(~max_mask, mag)
-            max_date = max_date.where(~max_mask,
-                                  (pd.Timestamp(d) - pd.Timestamp("1970-01-01")) // pd.Timedelta(days=1),
-                                  )
-
-            # Last anomaly
-            last_mag = xr.where(mask, mag, last_mag)
-            last_mag = last_mag.where(~mask, mag)
-            last_date = last_date.where(~mask,
-                                  (pd.Timestamp(d) - pd.Timestamp("1970-01-01")) // pd.Timedelta(days=1),
-                                  )
+        self.params = {'thresholds': list(thresholds),
+                       'anomaly_type': anomaly_type,
+                       'window_backward': window_backward,
+                       'window_forward': window_forward,
+                       'min_obs_backward': min_obs_backward,
+                       'min_obs_forward': min_obs_forward,
+                       'out_crs': out_crs,
+                       'date_dtype': np.dtype(date_dtype).name}
+        self.state = None
+
+        da = self.da
+        if da.chunks:
+            # full time series in each chunk, spatial chunks kept
+            da = da.chunk({'time': -1})
+        times = da['time'].values
+        tmin = times.min()
+        last_day = (times.max() - np.datetime64('1970-01-01')) // np.timedelta64(1, 'D')
+        if last_day > np.iinfo(date_dtype).max:
+            raise ValueError(f"Dates exceed the range of '{date_dtype}'.")
+
+        # pivot dates (time indices)
+        pivots = np.flatnonzero(
+            (times >= tmin + np.timedelta64(window_backward, 'D'))
+            & (times <= times.max() - np.timedelta64(window_forward, 'D')))
+
+        outputs = self.__run(da, times, pivots, store_magnitude, magnitude_sparse)
+        self.time = times[pivots]
+        self.__set_detection(*outputs[:7])
+        self.__last_run = {'series': da, 'times': times, 'pivots': pivots,
+                           'pending': outputs[7], 'tmin': tmin,
+                           'revisit_from': tmin + np.timedelta64(window_backward, 'D')}
+
+        if store_magnitude:
+            magnitude = (outputs[8]
+                         .assign_coords(time=times[pivots])
+                         .transpose(*da.dims)
+                         .rename('magnitude'))
+            if isinstance(store_magnitude, (str, os.PathLike)):
+                self.magnitude_ts = self.__write_magnitude(magnitude,
+                                                           str(store_magnitude))
+            else:
+                self.magnitude_ts = magnitude
+
+    def __run(self, da, times, pivots, store_magnitude=False, magnitude_sparse=False):
+        """
+        Apply the detection kernel to a time series, chunk-wise.
 
-            in_range = in_range | inrange_b | inrange_f
+        Args:
+            da (xr.DataArray): time series, one chunk along time.
+            times (np.ndarray): dates of ``da``.
+            pivots (np.ndarray): time indices of the pivot dates.
+            store_magnitude (bool, optional): also return the magnitudes.
+            magnitude_sparse (bool, optional): see ``detect_anomalies``.
 
-        self.time = time
+        Returns:
+            tuple: outputs of ``_clearcut_block`` as xr.DataArray.
+        """
+        p = self.params
+        lo_back = np.searchsorted(
+            times, times - np.timedelta64(p['window_backward'], 'D'), side='left')
+        hi_forw = np.searchsorted(
+            times, times + np.timedelta64(p['window_forward'], 'D'), side='right') - 1
+
+        n_mag = 1 if store_magnitude else 0
+        date_dtype = np.dtype(p['date_dtype'])
+        return xr.apply_ufunc(
+            _clearcut_block,
+            da,
+            input_core_dims=[['time']],
+            output_core_dims=[[]] * 8 + [['time']] * n_mag,
+            exclude_dims={'time'},
+            kwargs={'times': times,
+                    'pivots': pivots,
+                    'lo_back': lo_back,
+                    'hi_forw': hi_forw,
+                    'thresholds': p['thresholds'],
+                    'anomaly_type': p['anomaly_type'],
+                    'min_obs_backward': p['min_obs_backward'],
+                    'min_obs_forward': p['min_obs_forward'],
+                    'store_magnitude': bool(store_magnitude),
+                    'magnitude_sparse': magnitude_sparse,
+                    'date_dtype': date_dtype},
+            dask='parallelized',
+            output_dtypes=([np.float32, date_dtype] * 3 + [np.uint8, np.int64]
+                           + [np.float32] * n_mag),
+            dask_gufunc_kwargs=({'output_sizes': {'time': len(pivots)}}
+                                if store_magnitude else None),
+        )
 
+    def __set_detection(self, first_mag, first_date, max_mag, max_date,
+                        last_mag, last_date, flags):
+        """
+        Assemble ``ClearCut.detection`` from the per-pixel results.
+        """
+        nodata = np.iinfo(self.params['date_dtype']).min
+        first_date, max_date, last_date = [
+            date.assign_attrs(nodata=nodata) for date in (first_date, max_date, last_date)]
+        flags = flags.assign_attrs(flag_masks=[FLAG_ANOMALY, FLAG_INRANGE],
+                                   flag_meanings="anomaly inrange")
         # Classification based on max magnitude
-        class_layer = self.__classify_anomalies(max_mag, thresholds)
+        class_layer = self.__classify_anomalies(max_mag, self.params['thresholds'])
 
         self.detection = xr.Dataset({
             'magnitude_first': first_mag,
@@ -538,11 +1668,327 @@ class ClearCut:
             'date_max': max_date,
             'magnitude_last': last_mag,
             'date_last': last_date,
-            'mask': ~np.isnan(first_mag),
-            'inrange': in_range,
+            'flags': flags,
             'classif': class_layer,
         })
-        self.detection = self.detection.rio.write_crs(out_crs)
+        self.detection = self.detection.rio.write_crs(self.params['out_crs'])
+
+    def get_state(self):
+        """
+        Per-pixel state needed to resume the detection with later dates.
+
+        The state holds the first/max/last magnitudes and dates, the in-range
+        mask and the observations that later windows can still reach: the
+        dates from ``window_backward`` days before the first pivot date whose
+        result may still change, and the ``min_obs_backward`` last valid
+        values before them (backward fallback). Its size depends on the
+        window lengths, not on the length of the history.
+
+        Returns:
+            xr.Dataset: state, also stored in ``ClearCut.state``.
+
+        Example:
+            >>> ndvi_ts.detect_anomalies()
+            >>> ndvi_ts.get_state().to_netcdf('clearcut_state.nc')
+        """
+        if self.state is not None:
+            return self.state
+        if self.__last_run is None:
+            raise ValueError("No detection to resume: run detect_anomalies() first.")
+
+        run = self.__last_run
+        p = self.params
+        times, pivots = run['times'], run['pivots']
+        results = self.detection[['magnitude_first', 'date_first', 'magnitude_max',
+                                  'date_max', 'magnitude_last', 'date_last',
+                                  'flags']]
+        first_pending, results = dask.compute(run['pending'].min(), results)
+
+        if first_pending < len(pivots):
+            revisit_from = times[pivots[int(first_pending)]]
+        elif len(pivots):
+            revisit_from = times[pivots[-1]] + np.timedelta64(1, 'ns')
+        else:
+            revisit_from = run['revisit_from']
+        keep_from = revisit_from - np.timedelta64(p['window_backward'], 'D')
+        k0 = int(np.searchsorted(times, keep_from, side='left'))
+
+        history = xr.apply_ufunc(
+            _last_valid,
+            run['series'].isel(time=slice(None, k0)),
+            input_core_dims=[['time']],
+            output_core_dims=[['rank']],
+            exclude_dims={'time'},
+            kwargs={'n': p['min_obs_backward']},
+            dask='parallelized',
+            output_dtypes=[float],
+            dask_gufunc_kwargs={'output_sizes': {'rank': p['min_obs_backward']}},
+        ).astype(np.result_type(run['series'].dtype, np.float32)
+        )
+
+        self.state = results.assign(
+            tail=run['series'].isel(time=slice(k0, None)),
+            history=history,
+        )
+        self.state.attrs = {
+            **p,
+            'tmin': str(run['tmin']),
+            'revisit_from': str(revisit_from),
+        }
+        return self.state
+
+    @classmethod
+    def from_state(cls, state):
+        """
+        Create a `ClearCut` object from a persisted state.
+
+        Args:
+            state (xr.Dataset or str): state (see ``ClearCut.get_state``)
+                or path of the NetCDF file holding it.
+
+        Returns:
+            ClearCut: object whose ``detection`` is restored and that can be
+                advanced with ``ClearCut.update``.
+
+        Example:
+            >>> ndvi_ts = ClearCut.from_state('clearcut_state.nc')
+            >>> ndvi_ts.update(new_ndvi)
+        """
+        if not isinstance(state, xr.Dataset):
+            state = xr.open_dataset(state).load()
+
+        obj = cls(state['tail'])
+        attrs = state.attrs
+        obj.params = {'thresholds': np.atleast_1d(attrs['thresholds']).tolist(),
+                      'anomaly_type': str(attrs['anomaly_type']),
+                      'window_backward': int(attrs['window_backward']),
+                      'window_forward': int(attrs['window_forward']),
+                      'min_obs_backward': int(attrs['min_obs_backward']),
+                      'min_obs_forward': int(attrs['min_obs_forward']),
+                      'out_crs': str(attrs['out_crs']),
+                      'date_dtype': str(attrs['date_dtype'])}
+        obj.state = state
+        obj.time = np.array([], dtype='datetime64[ns]')
+        obj.__set_detection(*[state[k] for k in
+                              ('magnitude_first', 'date_first', 'magnitude_max',
+                               'date_max', 'magnitude_last', 'date_last',
+                               'flags')])
+        return obj
+
+    def update(self, new_scenes: xr.DataArray):
+        """
+        Advance the detection with new dates, from the persisted state.
+
+        Only the pivot dates whose result may change (see ``get_state``) and
+        the new ones are evaluated, so the cost depends on the window lengths
+        and on the new data, not on the length of the history. The result is
+        the one ``detect_anomalies`` would give on the full time series.
+
+        Args:
+            new_scenes (xr.DataArray): index time series of the new dates
+                (same dimensions as ``ClearCut.da``), all later than the
+                dates already processed.
+
+        Returns:
+            ClearCut.detection (xr.Dataset): updated detection,
+                ``ClearCut.state`` and ``ClearCut.da`` (recent dates only)
+                being updated too.
+
+        Example:
+            >>> ndvi_ts = ClearCut.from_state('clearcut_state.nc')
+            >>> ndvi_ts.update(new_ndvi)
+            >>> ndvi_ts.get_state().to_netcdf('clearcut_state.nc')
+        """
+        state = self.get_state()
+        p = self.params
+        tail = state['tail']
+        revisit_from = np.datetime64(state.attrs['revisit_from'])
+        tmin = np.datetime64(state.attrs['tmin'])
+        keep_from = revisit_from - np.timedelta64(p['window_backward'], 'D')
+
+        new_scenes = new_scenes.sortby('time')
+        last_date = tail['time'].values.max() if tail.sizes['time'] else keep_from
+        if new_scenes['time'].values.min() <= last_date:
+            raise ValueError("new_scenes must only hold dates later than "
+                             f"{last_date}.")
+
+        # backward fallback values, dated before every window of the update
+        n_hist = state.sizes['rank']
+        history = (state['history']
+                   .rename(rank='time')
+                   .assign_coords(time=keep_from - np.arange(n_hist, 0, -1)
+                                  * np.timedelta64(1, 'D'))
+                   .transpose(*tail.dims))
+        recent = xr.concat([tail, new_scenes.transpose(*tail.dims)], dim='time',
+                           coords='minimal', compat='override')
+        series = xr.concat([history, recent], dim='time',
+                           coords='minimal', compat='override')
+        if series.chunks:
+            series = series.chunk({'time': -1})
+        times = series['time'].values
+
+        pivots = np.flatnonzero(
+            (times >= revisit_from)
+            & (times >= tmin + np.timedelta64(p['window_backward'], 'D'))
+            & (times <= times.max() - np.timedelta64(p['window_forward'], 'D')))
+        outputs = self.__run(series, times, pivots)
+        (first_mag, first_date, max_mag, max_date,
+         last_mag, last_date, flags) = outputs[:7]
+
+        # merge with the previous results (re-evaluated dates are idempotent)
+        old = state
+        first_new = old['magnitude_first'].isnull()
+        max_new = max_mag.notnull() & (old['magnitude_max'].isnull()
+                                       | (abs(max_mag) > abs(old['magnitude_max'])))
+        last_new = last_mag.notnull()
+        self.__set_detection(
+            first_mag.where(first_new, old['magnitude_first']),
+            first_date.where(first_new, old['date_first']),
+            max_mag.where(max_new, old['magnitude_max']),
+            max_date.where(max_new, old['date_max']),
+            last_mag.where(last_new, old['magnitude_last']),
+            last_date.where(last_new, old['date_last']),
+            flags | old['flags'],
+        )
+
+        self.da = recent
+        self.time = times[pivots]
+        self.state = None
+        self.__last_run = {'series': series, 'times': times, 'pivots': pivots,
+                           'pending': outputs[7], 'tmin': tmin,
+                           'revisit_from': revisit_from}
+        self.state = self.get_state().compute()
+        self.detection = self.detection.compute()
+        return self.detection
+
+    def __write_magnitude(self, magnitude: xr.DataArray, path: str):
+        """
+        Write the magnitude timeseries and the detection dataset to a NetCDF
+        file or a Zarr store.
+
+        Both are written by a single pass over the (dask) chunks, so the
+        magnitudes are never held in memory as a whole. ``ClearCut.detection``
+        is then opened lazily from the store.
+
+        Args:
+            magnitude (xr.DataArray): magnitude timeseries.
+            path (str): output path, NetCDF if it ends with '.nc',
+                Zarr otherwise.
+
+        Returns:
+            xr.DataArray: magnitude timeseries lazily opened from the store.
+        """
+        ds = self.detection.assign(magnitude=magnitude)
+        ds = ds.rio.write_crs(self.detection.rio.crs)
+        if path.endswith('.nc'):
+            ds.to_netcdf(path, encoding={'magnitude': {'zlib': True}})
+            ds = xr.open_dataset(path, chunks={}, decode_coords='all')
+        else:
+            ds.to_zarr(path, mode='w')
+            ds = xr.open_zarr(path, decode_coords='all')
+
+        self.detection = ds.drop_vars(['magnitude', 'time'])
+        return ds['magnitude']
+
+
+def _local_mode(arr, rows, cols, window_size):
+    """
+    Most frequent value in a square window around some pixels of an image.
+
+    Same rule as ``skimage.filters.rank.modal``: only the pixels inside the
+    image are counted and ties go to the smallest value.
+
+    Args:
+        arr (np.ndarray): 2D integer image.
+        rows (np.ndarray): row indices of the pixels.
+        cols (np.ndarray): column indices of the pixels.
+        window_size (int): size of the square window.
+
+    Returns:
+        np.ndarray: mode of the window of each pixel.
+    """
+    offsets = np.arange(window_size) - window_size // 2
+    ny, nx = arr.shape
+    neighbours = []
+    for dy in offsets:
+        for dx in offsets:
+            r, c = rows + dy, cols + dx
+            inside = (r >= 0) & (r < ny) & (c >= 0) & (c < nx)
+            neighbours.append(np.where(inside, arr[r.clip(0, ny - 1), c.clip(0, nx - 1)], -1))
+    neighbours = np.stack(neighbours)
+
+    # score = count, then smallest value; outside pixels (-1) never win
+    counts = sum((neighbours == other) for other in neighbours)
+    counts[neighbours < 0] = -1
+    span = neighbours.max() + 2
+    score = counts * span + (span - 1 - neighbours)
+    return np.take_along_axis(neighbours, score.argmax(axis=0)[None], axis=0)[0]
+
+
+def _box_count(mask, window_size):
+    """
+    Number of True pixels in a square window around every pixel, the window
+    being truncated at the image borders.
+
+    Args:
+        mask (np.ndarray): 2D boolean image.
+        window_size (int): size of the square window.
+
+    Returns:
+        np.ndarray: counts, same shape as ``mask``.
+    """
+    from scipy.ndimage import correlate1d
+
+    ones = np.ones(window_size, dtype=np.int16)
+    counts = correlate1d(mask.astype(np.int16), ones, axis=0, mode='constant')
+    return correlate1d(counts, ones, axis=1, mode='constant')
+
+
+def _sieve_block(arr, min_size, window_size, ignore_nan, connectivity):
+    """
+    Sieve and majority filter of 2D classification images.
+
+    Args:
+        arr (np.ndarray): classification values, the last two axes being
+            'y' and 'x'.
+        min_size (int): minimum size (number of pixels) to keep.
+        window_size (int): size of the moving window for majority filter.
+        ignore_nan (bool): if True, NaNs are treated as background.
+        connectivity (int): 1 for 4-connectivity, 2 for 8-connectivity.
+
+    Returns:
+        np.ndarray: filtered values (float).
+    """
+    from skimage.measure import label
+
+    arr_float = np.array(arr, dtype=float)
+    nan_mask = np.isnan(arr_float) if ignore_nan else np.zeros(arr_float.shape, dtype=bool)
+    output = np.where(nan_mask, 0, arr_float)
+
+    for image in output.reshape((-1,) + output.shape[-2:]):
+        classes = image.astype(np.uint16)
+        # Step 1: one labelling of all the classes, sizes by bincount
+        labels = label(classes, background=0, connectivity=connectivity)
+        small = np.bincount(labels.ravel()) < min_size
+        small[0] = False
+        classes[small[labels]] = 0
+
+        # Step 2: majority filter, only needed at zero pixels where
+        # non-zero pixels are the majority of the window
+        zeros = classes == 0
+        ny, nx = zeros.shape
+        inside = np.outer(_box_count(np.ones((ny, 1), dtype=bool), window_size),
+                          _box_count(np.ones((1, nx), dtype=bool), window_size))
+        todo = zeros & (2 * _box_count(~zeros, window_size) > inside)
+        rows, cols = np.nonzero(todo)
+        if rows.size:
+            classes[rows, cols] = _local_mode(classes, rows, cols, window_size)
+        image[:] = classes
+
+    # Restore NaNs if needed
+    if ignore_nan:
+        output[nan_mask] = np.nan
+    return output
 
 
 def sieve_maj(dataarray,
@@ -555,6 +2001,13 @@ def sieve_maj(dataarray,
     Remove small connected objects and replace them with local majority value.
     Preserves original coordinates and CRS.
 
+    All the classes are labelled in a single pass and the majority filter is
+    only evaluated at background pixels having non-zero neighbours. Dask-backed
+    arrays are processed tile by tile with a halo of
+    ``min_size - 1 + window_size // 2`` pixels: an object smaller than
+    ``min_size`` cannot cross it, so the tiles give the same result as the
+    whole raster without merging objects across tiles.
+
     Args:
         dataarray (xr.DataArray): input array with integer classification values.
         min_size (int, optional): minimum size (number of pixels) to keep.
@@ -568,45 +2021,110 @@ def sieve_maj(dataarray,
         out_crs (str, optional): output CRS. Defaults to 'epsg:3035'.
 
     Returns:
-        xr.DataArray: filtered DataArray with original coords and CRS.
+        xr.DataArray: filtered DataArray with original coords and CRS
+            (lazy for dask-backed inputs).
 
     Example:
         >>> sieve_maj(ndvi_ts.detection.classif)
     """
-    # Force float for final output to allow NaNs
-    arr_float = dataarray.values.astype(float).copy()
+    kwargs = {'min_size': min_size,
+              'window_size': window_size,
+              'ignore_nan': ignore_nan,
+              'connectivity': connectivity}
+
+    if dataarray.chunks:
+        halo = max(min_size - 1, 0) + window_size // 2
+        depth = {axis: 0 for axis in range(dataarray.ndim)}
+        depth.update({dataarray.ndim - 2: halo, dataarray.ndim - 1: halo})
+        # a single chunk along the non-spatial axes
+        data = dataarray.data.rechunk({axis: -1 for axis in range(dataarray.ndim - 2)})
+        output = data.map_overlap(_sieve_block, depth=depth, boundary='none',
+                                  dtype=float, **kwargs)
+    else:
+        output = _sieve_block(dataarray.values, **kwargs)
 
-    # Handle NaNs
-    nan_mask = np.isnan(arr_float) if ignore_nan else np.zeros_like(arr_float, dtype=bool)
-    arr_int = arr_float.copy()
-    if ignore_nan:
-        arr_int[nan_mask] = 0  # treat NaN as background
-
-    # Step 1: Identify small objects
-    output = arr_int.copy()
-    for cls in np.unique(arr_int):
-        if cls == 0:  # skip background
-            continue
-        mask = arr_int == cls
-        labeled, num_features = label(mask, structure=np.ones((3,3)) if connectivity == 2 else None)
-        sizes = np.bincount(labeled.ravel())
-        small_ids = np.where(sizes < min_size)[0]
-        remove_mask = np.isin(labeled, small_ids)
-        output[remove_mask] = 0  # mark small objects as background
-
-    # Step 2: Compute majority filter using skimage (fast)
-    arr_uint = output.astype(np.uint16)
-    majority_neighborhood = modal(arr_uint, square(window_size))
-
-    # Step 3: Replace zeros with local majority
-    output[output == 0] = majority_neighborhood[output == 0]
+    # Preserve coords and CRS
+    result = xr.DataArray(output, coords=dataarray.coords, dims=dataarray.dims,
+                          attrs=dataarray.attrs)
+    result.name = dataarray.name
+    return result.rio.write_crs(out_crs)
 
-    # Restore NaNs if needed
-    if ignore_nan:
-        output[nan_mask] = np.nan
 
-    # Preserve coords and CRS
-    return xr.DataArray(output, coords=dataarray.coords, dims=dataarray.dims, attrs=dataarray.attrs).rio.write_crs(out_crs)
+def extract_points(obj, points, pixel=False, tolerance=None, id_column=None,
+                   compute=True):
+    """
+    Extract the time series of many points from a cube in a single
+    vectorized indexing pass.
+
+    The points are converted to pixel indices once (nearest pixel), then
+    all their time series are read together (pointwise indexing, i.e. a
+    single dask computation on a lazy cube).
+
+    Args:
+        obj (xr.Dataset or xr.DataArray): time series cube ('time', 'y', 'x'),
+            e.g. ``StacAttack.cube`` or ``StacAttack.indices``.
+        points (gpd.GeoDataFrame or array-like): points, either a
+            GeoDataFrame of points (e.g. ``Csv2gdf.gdf``), reprojected to the
+            CRS of `obj` if needed, or an array of shape (n, 2) of (x, y)
+            coordinates, or of (i, j) pixel indices (column, row) if `pixel`
+            is True.
+        pixel (bool, optional): If True, `points` are pixel indices.
+            Defaults to False.
+        tolerance (float, optional): maximum distance, in CRS units, between a
+            point and its pixel center along each axis. Points farther away
+            get NaN values. Defaults to None (nearest pixel, whatever the
+            distance).
+        id_column (str, optional): column of the GeoDataFrame labelling the
+            points. Defaults to None (GeoDataFrame index, or 0..n-1).
+        compute (bool, optional): If True, loads the result in memory.
+            Defaults to True.
+
+    Returns:
+        xr.DataArray: time series of shape ('point', 'time', 'band'), where
+            'band' holds the variables of a Dataset, with the coordinates of
+            the pixel centers as 'x' and 'y' along 'point'.
+
+    Raises:
+        ValueError: if pixel indices fall outside the cube.
+
+    Example:
+        >>> geotable.set_gdf(3035)
+        >>> samples = extract_points(stacObj.indices, geotable.gdf, id_column='gid')
+    """
+    labels = None
+    if hasattr(points, 'geometry'):
+        crs = obj.rio.crs
+        if crs is not None and points.crs is not None and points.crs != crs:
+            points = points.to_crs(crs)
+        labels = (points[id_column] if id_column else points.index).to_numpy()
+        points = np.column_stack([points.geometry.x, points.geometry.y])
+    points = np.asarray(points)
+
+    if pixel:
+        cols, rows = points[:, 0].astype(int), points[:, 1].astype(int)
+        if ((cols < 0) | (cols >= obj.sizes['x'])
+                | (rows < 0) | (rows >= obj.sizes['y'])).any():
+            raise ValueError("Pixel indices outside of the cube.")
+    else:
+        cols = pd.Index(obj['x'].values).get_indexer(points[:, 0], method='nearest',
+                                                     tolerance=tolerance)
+        rows = pd.Index(obj['y'].values).get_indexer(points[:, 1], method='nearest',
+                                                     tolerance=tolerance)
+    found = (cols >= 0) & (rows >= 0)
+
+    result = obj.isel(x=xr.DataArray(cols.clip(0), dims='point'),
+                      y=xr.DataArray(rows.clip(0), dims='point'))
+    if isinstance(result, xr.Dataset):
+        result = result.to_array('band')
+    elif 'band' not in result.dims:
+        result = result.expand_dims(band=[result.name])
+    if not found.all():
+        result = result.where(xr.DataArray(found, dims='point'))
+    result = result.assign_coords(
+        point=labels if labels is not None else np.arange(len(points)))
+    result = result.transpose('point', 'time', 'band')
+
+    return result.compute() if compute else result
 
 
 class SitsPlotter:
@@ -700,6 +2218,8 @@ class SitsPlotter:
         self.omega = 2 * np.pi / 365.25
 
         # Plot Setup
+        import matplotlib.pyplot as plt
+
         self.ax_mag = None
         self.fig, self.ax = plt.subplots(figsize=(12, 4), dpi=100)
         self._setup_canvas()
@@ -868,12 +2388,8 @@ class SitsPlotter:
         return self.beta
 
     def _build_design_matrix(self, t_days, degree, include_trend):
-        cols = [np.ones(len(t_days))]
-        if include_trend: cols.append(t_days)
-        for d in range(1, degree + 1):
-            cols.append(np.cos(d * self.omega * t_days))
-            cols.append(np.sin(d * self.omega * t_days))
-        return np.column_stack(cols)
+        return _harmonic_design(t_days, degree, include_trend,
+                                period=2 * np.pi / self.omega)
 
     def run_detection(self, detector_class=ClearCut, thresholds=[0.2, 0.3, 0.4],
                       anomaly_type="absolute", **kwargs):
@@ -912,6 +2428,9 @@ class SitsPlotter:
         # Sort thresholds
         thresholds = sorted(thresholds, key=abs)
 
+        import matplotlib.pyplot as plt
+        from mpl_toolkits.axes_grid1 import make_axes_locatable
+
         # Dynamic axis creation
         if self.ax_mag is None:
             # Adjust the figure size to accommodate the new plot
@@ -947,7 +2466,7 @@ class SitsPlotter:
         # Extract dates and plot vertical lines
         det = mini_detector.detection.squeeze()
         d_max = (pd.Timestamp("1970-01-01") + pd.Timedelta(days=int(det.date_max.values))
-                 if not np.isnan(det.date_max.values) else None)
+                 if det.date_max.values != det.date_max.attrs['nodata'] else None)
 
         if d_max:
             self.ax.axvline(d_max, color='magenta', ls='--', lw=1.5, label='Max Anomaly', zorder=10)
@@ -979,4 +2498,291 @@ class SitsPlotter:
 
         # Use bbox_inches='tight' to ensure the legend outside is included in the image
         self.fig.savefig(path, dpi=300, bbox_inches='tight')
-        return path
\ No newline at end of file
+        return path
+
+    @classmethod
+    def render_batch(cls, sits_object, band_index, daterange, points,
+                     output_path="output", coords=False,
+                     break_date=datetime(2024, 1, 1), ylim=[-1, 1],
+                     filter_method=None, filter_value=1.5,
+                     degree=None, include_trend=True, envelope_quantiles=(0.25, 0.75),
+                     thresholds=None, anomaly_type="absolute", detection_params=None,
+                     executor=None, block_size=100, dpi=100):
+        """
+        Renders the plots of many pixels straight to PNG files.
+
+        Batch counterpart of `SitsPlotter` (points, outlier filter,
+        `plot_model` and `run_detection` panels) for QA plots of thousands
+        of pixels: the time series of all the pixels are read in a single
+        vectorized indexing pass, filtered and modelled together, and their
+        detection runs in a single `ClearCut`. Each worker then reuses one
+        matplotlib figure (no pyplot), only updating its artists between
+        pixels.
+
+        Args:
+            sits_object (xr.Dataset): Time series dataset (e.g., `StacAttack.cube` or `StacAttack.indices`).
+            band_index (str): The specific band or index name to display (e.g., 'B04', 'NDVI').
+            daterange (list[datetime]): Period to display as [start_date, end_date].
+            points (array-like or gpd.GeoDataFrame): pixels as (i, j) image
+                indices (column, row), or as (x, y) coordinates or point
+                geometries when `coords` is True (see `extract_points`).
+            output_path (str, optional): output directory. Defaults to "output".
+            coords (bool, optional): If True, `points` are coordinates in the
+                CRS of sits_object, matched to the nearest pixel. Defaults to False.
+            break_date (datetime, optional): The transition point between fitting
+                and monitoring periods. Defaults to 2024-01-01.
+            ylim (list[float], optional): Y-axis limits for the plot. Defaults to [-1, 1].
+            filter_method (str, optional): Outlier detection method: 'sigma' or 'iqr'.
+                Defaults to None.
+            filter_value (float, optional): Threshold for filtering. Defaults to 1.5.
+            degree (int, optional): number of harmonics of the model (see
+                `plot_model`). Defaults to None (no model).
+            include_trend (bool, optional): Whether to include a linear trend
+                component in the model. Defaults to True.
+            envelope_quantiles (tuple[float, float], optional): quantiles of the
+                residuals of the model envelope. Defaults to (0.25, 0.75).
+            thresholds (list[float], optional): thresholds of the detection
+                (see `run_detection`). Defaults to None (no detection).
+            anomaly_type (str, optional): The mode for anomaly detection.
+                Defaults to 'absolute'.
+            detection_params (dict, optional): additional arguments of
+                `ClearCut.detect_anomalies`. Defaults to None.
+            executor (optional): renders blocks of pixels on processes, either
+                'processes' (a process pool over all the CPU cores) or any
+                object with a ``submit`` method (e.g. a
+                ``concurrent.futures.ProcessPoolExecutor``). Defaults to None
+                (rendered in the current process).
+            block_size (int, optional): number of pixels per block sent to the
+                executor. Defaults to 100.
+            dpi (int, optional): resolution of the PNG files. Defaults to 100.
+
+        Returns:
+            list[str]: paths of the PNG files, "sits_{band_index}_{k}.png"
+                for the k-th point.
+
+        Example:
+            >>> paths = SitsPlotter.render_batch(
+            ...     stacObj.indices, 'NDVI', daterange, points=[(10, 20), (35, 4)],
+            ...     degree=2, thresholds=[0.2, 0.3], executor='processes')
+        """
+        if filter_method not in (None, 'sigma', 'iqr'):
+            raise ValueError("method must be 'sigma' or 'iqr'")
+        if thresholds is not None:
+            if any(t > 0 for t in thresholds) and any(t < 0 for t in thresholds):
+                raise ValueError(f"Mixed signs detected in thresholds: {thresholds}. "
+                                 "Must be all positive or all negative.")
+            thresholds = sorted(thresholds, key=abs)
+
+        # 1. Extraction: one vectorized read for all the pixels
+        series = extract_points(sits_object[band_index], points, pixel=not coords)
+        times = series.time.values
+        values = series.values[..., 0].astype(float)
+
+        fit_start, fit_end = np.datetime64(daterange[0]), np.datetime64(break_date)
+        in_fit = (times >= fit_start) & (times <= fit_end)
+        before = times < np.datetime64(break_date)
+        payload = {'times': times, 'values': values, 'before': before}
+
+        # 2. Outlier filtering
+        outliers = np.zeros(values.shape, dtype=bool)
+        if filter_method is not None:
+            outliers = _outlier_mask(values, in_fit, filter_method, filter_value)
+            payload['outliers'] = outliers
+        filtered = np.where(outliers, np.nan, values)
+
+        # 3. Model, fitted on all the pixels at once
+        if degree is not None:
+            t0 = np.datetime64(daterange[0])
+            t_days = ((times[in_fit] - t0) // np.timedelta64(1, 'D')).astype(float)
+            X = _harmonic_design(t_days, degree, include_trend)
+            coefs = _masked_lstsq(filtered[:, in_fit], X)
+            full_dates = pd.date_range(daterange[0], daterange[1], freq='D').values
+            t_full = ((full_dates - t0) // np.timedelta64(1, 'D')).astype(float)
+            res = filtered[:, in_fit] - coefs @ X.T
+            q = np.full((len(values), 2), np.nan)
+            fitted = np.isfinite(coefs[:, 0])
+            if fitted.any():
+                q[fitted] = np.nanquantile(res[fitted], envelope_quantiles, axis=1).T
+            payload.update(model_dates=full_dates,
+                           model=coefs @ _harmonic_design(t_full, degree, include_trend).T,
+                           envelope=q, quantiles=envelope_quantiles)
+
+        # 4. Detection, run once for all the pixels
+        if thresholds is not None:
+            pixels = xr.DataArray(values.T[:, None, None, :],
+                                  dims=('time', 'band', 'y', 'x'),
+                                  coords={'time': times, 'y': [0],
+                                          'x': np.arange(len(values))})
+            detector = ClearCut(pixels)
+            detector.detect_anomalies(thresholds=thresholds, anomaly_type=anomaly_type,
+                                      store_magnitude=True, **(detection_params or {}))
+            date_max = detector.detection.date_max.values[0, 0]
+            payload.update(
+                magnitude_dates=detector.magnitude_ts.time.values,
+                magnitude=detector.magnitude_ts.values[:, 0, 0].T,
+                date_max=np.where(date_max == detector.detection.date_max.attrs['nodata'],
+                                  np.datetime64('NaT'),
+                                  np.datetime64('1970-01-01') + date_max.astype('timedelta64[D]')))
+
+        # 5. Rendering
+        if not os.path.exists(output_path):
+            os.makedirs(output_path)
+        paths = [os.path.join(output_path, f"sits_{band_index}_{k}.png")
+                 for k in range(len(values))]
+        layout = {'band_index': band_index, 'daterange': daterange,
+                  'break_date': break_date, 'ylim': ylim, 'dpi': dpi}
+
+        per_pixel = [k for k, v in payload.items() if isinstance(v, np.ndarray)
+                     and v.ndim == 2 and len(v) == len(values)]
+        per_pixel += ['date_max'] if 'date_max' in payload else []
+        blocks = []
+        for i in range(0, len(values), block_size):
+            block = dict(payload)
+            for k in per_pixel:
+                block[k] = payload[k][i:i + block_size]
+            blocks.append((block, layout, paths[i:i + block_size]))
+
+        if executor is None:
+            for block in blocks:
+                _render_block(*block)
+        elif executor == 'processes':
+            from concurrent.futures import ProcessPoolExecutor
+
+            with ProcessPoolExecutor() as pool:
+                list(pool.map(_render_block, *zip(*blocks)))
+        else:
+            for future in [executor.submit(_render_block, *block) for block in blocks]:
+                future.result()
+
+        return paths
+
+
+def _outlier_mask(values, in_fit, method, value):
+    """
+    Outliers of many time series, as in `SitsPlotter._apply_outlier_filter`:
+    the bounds come from the dates of the fitting window, and only these
+    dates can be outliers.
+
+    Args:
+        values (np.ndarray): time series of shape (pixels, time).
+        in_fit (np.ndarray): boolean mask of the fitting window dates.
+        method (str): 'sigma' or 'iqr'.
+        value (float): multiplier of the std or of the IQR.
+
+    Returns:
+        np.ndarray: boolean mask of the outliers, shaped as `values`.
+    """
+    from .smoothing import _outlier_bounds
+
+    lower, upper = _outlier_bounds(values[:, in_fit], method, value)
+    return in_fit & ((values < lower[:, None]) | (values > upper[:, None]))
+
+
+def _render_block(block, layout, paths):
+    """
+    Render the plots of a block of pixels (see `SitsPlotter.render_batch`).
+
+    A single figure is used: its static part (axes, ticks, periods, legend)
+    is drawn once, then for every pixel only the updated artists are drawn
+    over a copy of it (blitting) and the buffer is written to PNG.
+    """
+    import matplotlib.dates as mdates
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+    from PIL import Image
+
+    def num(dates):
+        return mdates.date2num(np.asarray(dates, dtype='datetime64[ns]'))
+
+    def fill_verts(x, low, high):
+        return [np.column_stack([np.r_[x, x[::-1]], np.r_[low, high[::-1]]])]
+
+    detection = 'magnitude' in block
+    fig = Figure(figsize=(12, 7 if detection else 4), dpi=layout['dpi'])
+    canvas = FigureCanvasAgg(fig)
+    if detection:
+        ax, ax_mag = fig.subplots(2, 1, sharex=True,
+                                  gridspec_kw={'height_ratios': [2, 1]})
+    else:
+        ax = fig.subplots()
+    fig.subplots_adjust(right=0.8)
+
+    # static artists, as in SitsPlotter._setup_canvas
+    daterange, break_dt = layout['daterange'], layout['break_date']
+    ax.set_xlim(num([min(daterange), max(daterange)]))
+    ax.set_ylim(layout['ylim'])
+    ax.set_ylabel(f"Index: {layout['band_index']}")
+    ax.grid(True, alpha=0.3, linestyle=':')
+    ax.xaxis_date()
+    ax.axvspan(*num([daterange[0], break_dt]), color='tab:blue', alpha=0.1, label='Calibration')
+    ax.axvspan(*num([break_dt, daterange[1]]), color='tab:orange', alpha=0.05, label='Monitoring')
+    ax.axvline(num([break_dt])[0], color='red', linestyle='--', alpha=0.5)
+
+    # dynamic artists, updated for every pixel
+    t = num(block['times'])
+    before = block['before']
+    empty = np.empty((0, 2))
+    fit_pts = ax.scatter(empty[:, 0], empty[:, 1], s=25, color='forestgreen', label='Fit Data')
+    mon_pts = ax.scatter(empty[:, 0], empty[:, 1], s=25, color='darkorange', label='Monitor Data')
+    dynamic = [fit_pts, mon_pts]
+    if 'outliers' in block:
+        out_pts = ax.scatter(empty[:, 0], empty[:, 1], marker='x', color='red', s=20,
+                             label='Outliers')
+        dynamic.append(out_pts)
+    if 'model' in block:
+        t_model = num(block['model_dates'])
+        q_low, q_high = block['quantiles']
+        model_line, = ax.plot([], [], color='crimson', lw=2, label='Model Trend', zorder=5)
+        envelope = ax.fill_between(t_model, 0, 0, color='crimson', alpha=0.15, zorder=4,
+                                   label=f'Uncertainty ({int(q_low*100)}%-{int(q_high*100)}%)')
+        dynamic += [envelope, model_line]
+    if detection:
+        t_mag = num(block['magnitude_dates'])
+        ax_mag.grid(True, alpha=0.3, linestyle=':')
+        ax_mag.set_ylabel("Detection Mag.")
+        ax_mag.axhline(0, color='black', lw=0.5)
+        mag_line, = ax_mag.plot([], [], color='purple', lw=1.2, label='Magnitude')
+        mag_fill = ax_mag.fill_between(t_mag, 0, 0, color='purple', alpha=0.15)
+        max_line = ax.axvline(0, color='magenta', ls='--', lw=1.5, label='Max Anomaly', zorder=10)
+        max_line_mag = ax_mag.axvline(0, color='magenta', ls='--', lw=1.5)
+        dynamic += [mag_fill, mag_line, max_line, max_line_mag]
+        ax_mag.set_ylim(np.nanmin(block['magnitude'], initial=0) - 0.05,
+                        np.nanmax(block['magnitude'], initial=0) + 0.05)
+    ax.legend(loc='upper left', bbox_to_anchor=(1.02, 1), fontsize='small',
+              borderaxespad=0, frameon=False)
+
+    for artist in dynamic:
+        artist.set_animated(True)
+    canvas.draw()
+    background = canvas.copy_from_bbox(fig.bbox)
+
+    for k, path in enumerate(paths):
+        values = block['values'][k]
+        shown = values
+        if 'outliers' in block:
+            outliers = block['outliers'][k]
+            shown = np.where(outliers, np.nan, values)
+            out_pts.set_offsets(np.column_stack([t[outliers], values[outliers]]))
+        fit_pts.set_offsets(np.column_stack([t[before], shown[before]]))
+        mon_pts.set_offsets(np.column_stack([t[~before], values[~before]]))
+        if 'model' in block:
+            pred = block['model'][k]
+            low, high = block['envelope'][k]
+            model_line.set_data(t_model, pred)
+            envelope.set_verts(fill_verts(t_model, pred + low, pred + high))
+        if detection:
+            mag = block['magnitude'][k]
+            mag_line.set_data(t_mag, mag)
+            mag_fill.set_verts(fill_verts(t_mag, np.zeros_like(mag), np.nan_to_num(mag)))
+            d_max = block['date_max'][k]
+            for line in (max_line, max_line_mag):
+                line.set_visible(not np.isnat(d_max))
+                if not np.isnat(d_max):
+                    line.set_xdata(num([d_max, d_max]))
+
+        canvas.restore_region(background)
+        for artist in dynamic:
+            fig.draw_artist(artist)
+        image = np.asarray(canvas.buffer_rgba())[..., :3]
+        Image.fromarray(image).save(path, compress_level=1)
+    return paths
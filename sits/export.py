@@ -1,12 +1,79 @@
+import glob
 import xarray as xr
 import dask.array as dask_array
-import geogif
 import pandas as pd
-import imageio.v2 as imageio
 import numpy as np
 from PIL import Image, ImageDraw, ImageFont
-import matplotlib.cm as cm
 from importlib.resources import files
+from functools import lru_cache
+
+
+@lru_cache(maxsize=None)
+def _load_font(font_size):
+    """Watermark font, loaded once per size."""
+    try:
+        font_path = files("sits.fonts").joinpath("NotoSans-Regular.ttf")
+        return ImageFont.truetype(str(font_path), font_size)
+    except IOError:
+        return ImageFont.load_default()
+
+
+class _StreamingHistogram:
+    """
+    Histogram with a fixed number of bins whose range doubles when new values
+    fall outside of it, so that the quantiles of a stream of arrays are
+    estimated in one pass, with a precision of one bin width.
+    """
+
+    def __init__(self, bins=4096):
+        self.bins = bins + bins % 2
+        self.counts = np.zeros(self.bins, dtype=np.int64)
+        self.lo = None
+        self.width = None
+        self.min = np.inf
+        self.max = -np.inf
+
+    def update(self, values):
+        values = np.asarray(values, dtype=float).ravel()
+        values = values[np.isfinite(values)]
+        if values.size == 0:
+            return
+        vmin, vmax = values.min(), values.max()
+
+        if self.lo is None:
+            self.lo = vmin
+            self.width = max(vmax - vmin, abs(vmin) * 1e-6, 1e-12) / self.bins
+        # merge pairs of bins until the range covers the new values
+        while vmin < self.lo:
+            merged = self.counts.reshape(-1, 2).sum(axis=1)
+            self.counts = np.concatenate([np.zeros_like(merged), merged])
+            self.lo -= self.bins * self.width
+            self.width *= 2
+        while vmax > self.lo + self.bins * self.width:
+            merged = self.counts.reshape(-1, 2).sum(axis=1)
+            self.counts = np.concatenate([merged, np.zeros_like(merged)])
+            self.width *= 2
+
+        idx = np.clip(((values - self.lo) / self.width).astype(np.int64),
+                      0, self.bins - 1)
+        self.counts += np.bincount(idx, minlength=self.bins)
+        self.min, self.max = min(self.min, vmin), max(self.max, vmax)
+
+    def quantile(self, q):
+        total = self.counts.sum()
+        if total == 0:
+            return np.nan
+        # exact extremes, e.g. for a min/max stretch
+        if q <= 0:
+            return float(self.min)
+        if q >= 1:
+            return float(self.max)
+        cumulative = np.cumsum(self.counts)
+        target = q * total
+        k = min(np.searchsorted(cumulative, target), self.bins - 1)
+        before = cumulative[k] - self.counts[k]
+        frac = (target - before) / self.counts[k] if self.counts[k] else 0.0
+        return float(np.clip(self.lo + (k + frac) * self.width, self.min, self.max))
 
 
 class Sits_ds:
@@ -21,16 +88,51 @@ class Sits_ds:
         da (xr.Dataarray): time series ('time', 'band', 'y', 'x')
 
     Args:
-        nc_path (str, optional): netcdf filename to import into xarray object.
-            Defaults to None.
+        nc_path (str or list, optional): netcdf filename or Zarr store to
+            import into xarray object. A list of files or a glob pattern
+            (e.g. the outputs of ``Multiproc``) is opened as a single dataset
+            with ``xarray.open_mfdataset``. Defaults to None.
+        chunks (dict, optional): dask chunks of the opened dataset. The
+            default of one date per chunk lets the exports stream frames
+            from disk instead of loading the whole time series. Set to None
+            to load the dataset in memory. Defaults to 'auto_time', i.e.
+            {'time': 1}.
+        **kwargs: other arguments of ``xarray.open_dataset``
+            or ``xarray.open_mfdataset``.
 
     Example:
             >>> geo_dc = Sits_ds(netcdf_file)
+            >>> geo_dc = Sits_ds('output/fid-*_sat_image_*.nc')
     """
 
-    def __init__(self, nc_path=None):
+    def __init__(self, nc_path=None, chunks='auto_time', **kwargs):
+        if chunks == 'auto_time':
+            chunks = {'time': 1}
         if nc_path:
-            self.ds = xr.open_dataset(nc_path, engine="netcdf4")
+            self.ds = self.__open(nc_path, chunks, **kwargs)
+
+    @staticmethod
+    def __open(nc_path, chunks, **kwargs):
+        """
+        Lazily opens a netcdf file, a Zarr store, or several of them combined
+        along their coordinates.
+        """
+        if isinstance(nc_path, str) and any(c in nc_path for c in '*?['):
+            nc_path = sorted(glob.glob(nc_path))
+            if not nc_path:
+                raise ValueError("No file matches the glob pattern.")
+
+        if isinstance(nc_path, (list, tuple)):
+            engine = "zarr" if str(nc_path[0]).rstrip('/').endswith('.zarr') \
+                else "netcdf4"
+            ds = xr.open_mfdataset(nc_path, engine=engine, chunks=chunks,
+                                   combine="by_coords", **kwargs)
+        elif str(nc_path).rstrip('/').endswith('.zarr'):
+            ds = xr.open_dataset(nc_path, engine="zarr", chunks=chunks, **kwargs)
+        else:
+            ds = xr.open_dataset(nc_path, engine="netcdf4", chunks=chunks, **kwargs)
+
+        return ds if chunks is not None else ds.load()
 
     def __ds2da(self, keep_bands=['B04', 'B03', 'B02']):
         """
@@ -99,6 +201,9 @@ class Sits_ds:
         Dataset to create a uniformly spaced time dimension. It is particularly
         useful for preparing data for animations, temporal analysis, or
         numerical modeling where consistent temporal intervals are required.
+        With the 'linear' and 'slinear' methods, every new date is blended
+        from its two surrounding dates, so a lazy dataset stays one date
+        per chunk.
 
         Args:
             method (str, optional): interpolation method to use. Defaults to 'slinear'.
@@ -107,15 +212,78 @@ class Sits_ds:
         Returns:
             Sits_ds.ds (xr.Dataset): Dataset with regular time steps
 
+        Raises:
+            ValueError: if the dataset has fewer than two distinct dates.
+
         Example:
             >>> geo_dc = Sits_ds(netcdf_file)
             >>> geo_dc.time_interp()
         """
+        # duplicated dates would give zero-length intervals
+        self.ds = self.ds.sortby('time').drop_duplicates('time')
+        if self.ds.sizes['time'] < 2:
+            raise ValueError("Time interpolation requires at least two distinct dates.")
+
         new_times = pd.date_range(start=self.ds.time.min().values,
                                   end=self.ds.time.max().values,
                                   periods=nb_period)
 
-        self.ds = self.ds.interp(time=new_times, method=method)
+        if method not in ('linear', 'slinear'):
+            self.ds = self.ds.interp(time=new_times, method=method)
+            if self.ds.chunks:
+                self.ds = self.ds.chunk({'time': 1})
+            return
+
+        # every new date only depends on the two surrounding dates, so a lazy
+        # dataset is still read one date at a time during the export
+        times = self.ds.time.values.astype('datetime64[ns]').astype(np.int64)
+        new = new_times.values.astype('datetime64[ns]').astype(np.int64)
+        after = np.clip(np.searchsorted(times, new, side='right'), 1, len(times) - 1)
+        before = after - 1
+        alpha = xr.DataArray((new - times[before]) / (times[after] - times[before]),
+                             dims='time', coords={'time': new_times})
+
+        ds_start = self.ds.isel(time=before).assign_coords(time=new_times)
+        ds_end = self.ds.isel(time=after).assign_coords(time=new_times)
+        self.ds = self.__blend_datasets(ds_start, ds_end, alpha)
+
+    def band_percentiles(self, keep_bands, q=(2.0, 98.0), bins=4096):
+        """
+        Computes per-band percentiles across all the frames in one streaming
+        pass: the time series is read chunk by chunk into a histogram per
+        band, so the whole cube is never loaded in memory.
+
+        Args:
+            keep_bands (list): bands to process.
+            q (tuple, optional): percentiles to compute, between 0 and 100.
+                Defaults to (2.0, 98.0).
+            bins (int, optional): number of histogram bins. The precision
+                of the percentiles is the range of the band divided by
+                ``bins``. Defaults to 4096.
+
+        Returns:
+            np.ndarray: percentiles of shape (len(q), len(keep_bands)).
+
+        Example:
+            >>> vmin, vmax = geo_dc.band_percentiles(['B04', 'B03', 'B02'])
+        """
+        self.__ds2da(keep_bands)
+        hists = [_StreamingHistogram(bins) for _ in keep_bands]
+
+        if isinstance(self.da.data, dask_array.Array):
+            steps = self.da.chunks[0]
+        else:
+            n_time = self.da.sizes['time']
+            steps = [min(16, n_time - t) for t in range(0, n_time, 16)]
+
+        start = 0
+        for step in steps:
+            arr = self.da.isel(time=slice(start, start + step)).values
+            for b, hist in enumerate(hists):
+                hist.update(arr[:, b])
+            start += step
+
+        return np.array([[hist.quantile(p / 100) for hist in hists] for p in q])
 
     def export2gif(self, imgfile=None, fps=8, robust=True,
                    keep_bands=['B04', 'B03', 'B02'], **kwargs):
@@ -126,7 +294,8 @@ class Sits_ds:
             imgfile (string, optional): GIF file path.
             fps (int, optional): frames per second
             robust (bool, optional): calculate vmin and vmax from the 2nd and
-                98th percentiles of the data. Defaults to True.
+                98th percentiles of every band over all the frames
+                (see `Sits_ds.band_percentiles()`). Defaults to True.
             keep_bands (list, optional): bands to keep (1 or 3 bands for
                 gif export).
 
@@ -136,25 +305,37 @@ class Sits_ds:
         Example:
             >>> geo_dc.export2gif(imgfile='myTimeSeries.gif')
         """
-        self.__ds2da(keep_bands)
+        import geogif
+
+        if robust and 'vmin' not in kwargs and 'vmax' not in kwargs:
+            vmin, vmax = self.band_percentiles(keep_bands)
+            vmin = xr.DataArray(vmin, dims='band')
+            vmax = xr.DataArray(vmax, dims='band')
+            da = ((self.da - vmin) / (vmax - vmin)).clip(0, 1)
+            kwargs.update(vmin=0, vmax=1)
+            robust = False
+        else:
+            self.__ds2da(keep_bands)
+            da = self.da
 
-        if isinstance(self.da.data, dask_array.Array):
-            self.gif = geogif.dgif(self.da, fps=fps, robust=robust, **kwargs).compute()
+        if isinstance(da.data, dask_array.Array):
+            self.gif = geogif.dgif(da, fps=fps, robust=robust, **kwargs).compute()
             if imgfile:
                 with open(imgfile, "wb") as f:
                     f.write(self.gif.data)
         else:
-            self.gif = geogif.gif(self.da, fps=fps, robust=robust, to=imgfile, **kwargs)
+            self.gif = geogif.gif(da, fps=fps, robust=robust, to=imgfile, **kwargs)
 
-    def __add_watermark(self, frame: np.ndarray, text: str,
-                        position='bottom right',
-                        font_size=40, color=(255, 255, 255),
-                        opacity=128):
+    def __watermark_layer(self, height, width, text: str,
+                          position='bottom right',
+                          font_size=40, color=(255, 255, 255),
+                          opacity=128):
         """
-        Adds a semi-transparent text watermark to a NumPy RGB image using Pillow.
+        Prepares the text layer of a watermark for frames of a given size.
 
         Parameters:
-            frame (np.ndarray): RGB image of shape (H, W, 3), dtype=uint8
+            height (int): frame height in pixels
+            width (int): frame width in pixels
             text (str): Watermark text
             position (str): One of 'top left', 'top right', 'bottom left', 'bottom right'
             font_size (int): Font size in points
@@ -162,17 +343,12 @@ class Sits_ds:
             opacity (int): 0–255 transparency level
 
         Returns:
-            np.ndarray: Watermarked image as uint8 RGB array
+            tuple: region of the text (slices), premultiplied RGB colors and
+                complementary alpha of the layer over this region (float32).
         """
-        img = Image.fromarray(frame).convert("RGBA")
-        txt_layer = Image.new("RGBA", img.size, (255, 255, 255, 0))
+        txt_layer = Image.new("RGBA", (width, height), (255, 255, 255, 0))
         draw = ImageDraw.Draw(txt_layer)
-
-        try:
-            font_path = files("sits.fonts").joinpath("NotoSans-Regular.ttf")
-            font = ImageFont.truetype(str(font_path), font_size)
-        except IOError:
-            font = ImageFont.load_default()
+        font = _load_font(font_size)
 
         text_size = draw.textbbox((0, 0), text, font=font)
         text_width = text_size[2] - text_size[0]
@@ -181,17 +357,72 @@ class Sits_ds:
         margin = 10
         positions = {
             'top left': (margin, margin),
-            'top right': (img.width - text_width - margin, margin),
-            'bottom left': (margin, img.height - text_height - margin),
-            'bottom right': (img.width - text_width - margin, img.height - text_height - margin),
+            'top right': (width - text_width - margin, margin),
+            'bottom left': (margin, height - text_height - margin),
+            'bottom right': (width - text_width - margin, height - text_height - margin),
         }
         xy = positions.get(position, positions['bottom right'])
 
         draw.text(xy, text, font=font, fill=color + (opacity,))
-        watermarked = Image.alpha_composite(img, txt_layer).convert("RGB")
-        return np.array(watermarked, dtype=np.uint8)
+        bbox = txt_layer.getbbox() or (0, 0, 0, 0)
+        region = (slice(bbox[1], bbox[3]), slice(bbox[0], bbox[2]))
+
+        layer = np.asarray(txt_layer, dtype=np.float32)[region] / 255
+        alpha = layer[:, :, 3:]
+        return region, layer[:, :, :3] * alpha * 255, 1 - alpha
 
-    def __pad_to_square(self, frame: np.ndarray, dim=1080, fill_color=(0, 0, 0)):
+    @staticmethod
+    def __composite(frame: np.ndarray, layer):
+        """
+        Blends a text layer prepared by `Sits_ds.__watermark_layer()` over an
+        RGB frame, restricted to the region of the text.
+        """
+        region, premultiplied, keep = layer
+        out = frame.copy()
+        out[region] = (frame[region] * keep + premultiplied + 0.5).astype(np.uint8)
+        return out
+
+    def __add_watermark(self, frame: np.ndarray, text: str,
+                        position='bottom right',
+                        font_size=40, color=(255, 255, 255),
+                        opacity=128):
+        """
+        Adds a semi-transparent text watermark to a NumPy RGB image using Pillow.
+
+        Parameters:
+            frame (np.ndarray): RGB image of shape (H, W, 3), dtype=uint8
+            text (str): Watermark text
+            position (str): One of 'top left', 'top right', 'bottom left', 'bottom right'
+            font_size (int): Font size in points
+            color (tuple): RGB color of the text
+            opacity (int): 0–255 transparency level
+
+        Returns:
+            np.ndarray: Watermarked image as uint8 RGB array
+        """
+        layer = self.__watermark_layer(frame.shape[0], frame.shape[1], text,
+                                       position, font_size, color, opacity)
+        return self.__composite(frame, layer)
+
+    @staticmethod
+    def __square_canvas(height, width, dim=1080, fill_color=(0, 0, 0)):
+        """
+        Prepares the canvas on which frames of a given size are padded to
+        square format (see `Sits_ds.__pad_to_square()`).
+
+        Returns:
+            tuple: canvas (dim, dim, 3), size of the resized frame (w, h)
+                and its offset (x, y) on the canvas.
+        """
+        scale = dim / max(width, height)
+        new_w, new_h = int(width * scale), int(height * scale)
+        canvas = np.empty((dim, dim, 3), dtype=np.uint8)
+        canvas[:] = fill_color
+        offset = ((dim - new_w) // 2, (dim - new_h) // 2)
+        return canvas, (new_w, new_h), offset
+
+    def __pad_to_square(self, frame: np.ndarray, dim=1080, fill_color=(0, 0, 0),
+                        canvas=None):
         """
         Resizes frames to square format with the specified dimensions (in pixels).
 
@@ -200,36 +431,112 @@ class Sits_ds:
             dim (int, optional): size in pixels of the square side.
             fill_color (tuple, optional): fill color in RGB.
                 Defaults to (0, 0, 0), i.e. black.
+            canvas (tuple, optional): canvas prepared by
+                `Sits_ds.__square_canvas()`, reused for every frame.
+                Defaults to None.
 
         Returns:
             np.array
         """
-        img = Image.fromarray(frame)
-        w, h = img.size
-        scale = dim / max(w, h)
-        new_w, new_h = int(w * scale), int(h * scale)
-        img = img.resize((new_w, new_h), Image.BICUBIC)
-
-        # Create 1080x1080 canvas
-        canvas = Image.new("RGB", (dim, dim), fill_color)
-        offset = ((dim - new_w) // 2, (dim - new_h) // 2)
-        canvas.paste(img, offset)
-        return np.array(canvas)
+        if canvas is None:
+            canvas = self.__square_canvas(frame.shape[0], frame.shape[1],
+                                          dim, fill_color)
+        background, (new_w, new_h), (x, y) = canvas
+
+        img = Image.fromarray(frame).resize((new_w, new_h), Image.BICUBIC)
+        out = background.copy()
+        out[y:y + new_h, x:x + new_w] = np.asarray(img)
+        return out
+
+    def __prefetch(self, size):
+        """
+        Yields the frames of ``Sits_ds.da`` as numpy arrays (bands, y, x),
+        read from a background thread that keeps up to ``size`` frames ahead.
+        """
+        import queue
+        import threading
+
+        frames = queue.Queue(maxsize=size)
+        stop = threading.Event()
+        done = object()
+
+        def read():
+            try:
+                for t in range(self.da.sizes['time']):
+                    if stop.is_set():
+                        return
+                    frames.put(self.da.isel(time=t).values)
+                frames.put(done)
+            except BaseException as err:
+                frames.put(err)
+
+        reader = threading.Thread(target=read, daemon=True)
+        reader.start()
+        try:
+            while True:
+                arr = frames.get()
+                if arr is done:
+                    return
+                if isinstance(arr, BaseException):
+                    raise arr
+                yield arr
+        finally:
+            stop.set()
+            while reader.is_alive():
+                try:
+                    frames.get_nowait()
+                except queue.Empty:
+                    reader.join(0.01)
+
+    def __render_frame(self, arr, vmin, vmax, lut, bad_color,
+                       canvas, watermark):
+        """
+        Converts a frame (bands, y, x) into an RGB image (y, x, 3), dtype=uint8
+        (see `Sits_ds.export2vid()`). Monoband frames are quantized to 256
+        levels, then colored by indexing the lookup table ``lut``.
+        """
+        if lut is not None:
+            band = arr[0, :, :]
+            norm = np.clip((band - vmin) / (vmax - vmin), 0, 1) * 256
+            nodata = np.isnan(norm)
+            index = np.minimum(np.nan_to_num(norm), 255).astype(np.uint8)
+            rgb = lut[index]
+            if nodata.any():
+                rgb[nodata] = bad_color
+        else:
+            rgb = arr[(0, 1, 2), :, :]
+            rgb = np.transpose(rgb, (1, 2, 0))  # (y, x, 3)
+            rgb = np.clip((rgb - vmin) / (vmax - vmin), 0, 1)
+            rgb = (rgb * 255).astype(np.uint8)
+
+        if canvas is not None:
+            rgb = self.__pad_to_square(rgb, canvas=canvas)
 
+        if watermark is not None:
+            rgb = self.__composite(rgb, watermark)
+        return rgb
 
     def export2vid(self, output_path: str,
                    keep_bands: list,
                    fps: int = 10,
                    colormap: str = "viridis",
                    vmin=None, vmax=None,
+                   robust=True,
                    square=False,
                    watermark_text=None,
                    watermark_loc='bottom right',
                    watermark_param=None,
-                   square_param=None):
+                   square_param=None,
+                   workers=None,
+                   prefetch=4):
         """
         Export EO time series to video, supporting RGB and monoband with colormap.
 
+        The export is pipelined: a background thread reads the next frames
+        from ``Sits_ds.ds``, a thread pool renders them (contrast, colormap,
+        padding, watermark) and the encoder receives them in order, so that
+        reading, rendering and encoding overlap.
+
         Args:
             output_path (str): output filename. The video format is determined
                 by the file extension, if supported by the ImageIO library.
@@ -238,9 +545,15 @@ class Sits_ds:
             fps (int, optional): Defaults to 10.
             colormap (str, optional): Defaults to "viridis".
             vmin (float, optional): minimum value for band contrast.
-                Defaults to None.
+                Defaults to None, i.e. computed over all the frames
+                according to ``robust``.
             vmax (float, optional): maximum value for band contrast.
-                Defaults to None.
+                Defaults to None, i.e. computed over all the frames
+                according to ``robust``.
+            robust (bool, optional): when not given, calculate vmin and vmax
+                from the 2nd and 98th percentiles of every band over all the
+                frames, instead of their minimum and maximum
+                (see `Sits_ds.band_percentiles()`). Defaults to True.
             square (bool, optional): resizes frames to square format
                 (see `Sits_ds.__pad_to_square()`). Defaults to False.
             watermark_text (str, optional): watermark text.
@@ -250,41 +563,66 @@ class Sits_ds:
                 Defaults to 'bottom right'.
             watermark_param (**kwargs, optional): see `Sits_ds.__add_watermark()`.
             square_param (**kwargs, optional): see `Sits_ds.__pad_to_square()`.
+            workers (int, optional): number of rendering threads.
+                Defaults to None (number of CPUs).
+            prefetch (int, optional): number of frames read ahead.
+                Defaults to 4.
         """
+        import os
+        from collections import deque
+        from concurrent.futures import ThreadPoolExecutor
+        from functools import partial
+        import imageio.v2 as imageio
+        import matplotlib
+
+        if vmin is None or vmax is None:
+            # same stretch for all frames, streamed before the export
+            q = (2.0, 98.0) if robust else (0.0, 100.0)
+            low, high = self.band_percentiles(keep_bands, q=q)
+            vmin = low if vmin is None else vmin
+            vmax = high if vmax is None else vmax
         self.__ds2da(keep_bands)
         mono_mode = self.da.shape[1] == 1
-
-        with imageio.get_writer(output_path, fps=fps) as writer:
-            for t in range(self.da.sizes['time']):
-                arr = self.da.isel(time=t).values  # shape: (bands, y, x)
-
-                if mono_mode:
-                    band = arr[0, :, :]
-                    if vmin is None: vmin = band.min()
-                    if vmax is None: vmax = band.max()
-                    norm = np.clip((band - vmin) / (vmax - vmin), 0, 1)
-                    cmap = cm.get_cmap(colormap)
-                    rgb = (cmap(norm)[:, :, :3] * 255).astype(np.uint8)  # drop alpha
-                else:
-                    rgb = arr[(0, 1, 2), :, :]
-                    rgb = np.transpose(rgb, (1, 2, 0))  # (y, x, 3)
-                    if vmin is None:
-                        vmin = np.nanpercentile(rgb, 2.0)#, axis=(0, 1))
-                    if vmax is None:
-                        vmax = np.nanpercentile(rgb, 98.0)#, axis=(0, 1))
-                    rgb = np.clip((rgb - vmin) / (vmax - vmin), 0, 1)
-                    rgb = (rgb * 255).astype(np.uint8)
-
-                if square:
-                    square_param = square_param or {}
-                    rgb = self.__pad_to_square(rgb, fill_color=(0, 0, 0), **square_param)
-
-                if watermark_text:
-                    watermark_param = watermark_param or {}
-                    rgb = self.__add_watermark(rgb,
+        workers = workers or os.cpu_count() or 1
+        if mono_mode:
+            vmin, vmax = np.squeeze(vmin)[()], np.squeeze(vmax)[()]
+
+        # colormap, padding canvas and text layer are shared by all frames
+        lut, bad_color = None, None
+        if mono_mode:
+            cmap = matplotlib.colormaps[colormap]
+            lut = (cmap.resampled(256)(np.arange(256))[:, :3] * 255).astype(np.uint8)
+            bad_color = (np.array(cmap.get_bad()[:3]) * 255).astype(np.uint8)
+
+        height, width = self.da.sizes['y'], self.da.sizes['x']
+        canvas = None
+        if square:
+            canvas = self.__square_canvas(height, width, **(square_param or {}))
+            height, width = canvas[0].shape[:2]
+
+        watermark = None
+        if watermark_text:
+            watermark = self.__watermark_layer(height, width,
                                                text=watermark_text,
                                                position=watermark_loc,
-                                               **watermark_param)
-
-                writer.append_data(rgb)
-
+                                               **(watermark_param or {}))
+
+        render = partial(self.__render_frame,
+                         vmin=vmin,
+                         vmax=vmax,
+                         lut=lut,
+                         bad_color=bad_color,
+                         canvas=canvas,
+                         watermark=watermark)
+
+        with imageio.get_writer(output_path, fps=fps) as writer, \
+                ThreadPoolExecutor(max_workers=workers) as pool:
+            pending = deque()
+            for arr in self.__prefetch(prefetch):
+                pending.append(pool.submit(render, arr))
+                # ordered queue: the oldest frame is encoded first
+                if len(pending) > 2 * workers:
+                    writer.append_data(pending.popleft().result())
+
+            while pending:
+                writer.append_data(pending.popleft().result())
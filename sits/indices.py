@@ -1,6 +1,5 @@
 import xarray as xr
 import numpy as np
-import spyndex
 
 
 class SpectralIndex:
@@ -57,9 +56,64 @@ class SpectralIndex:
 
         return ds
 
+    def __fused_indices(self, bands, constants, indices_to_compute,
+                        scale_factor, packing):
+        """
+        Compute all the requested indices in a single pass over the bands.
+
+        The spyndex formulas are compiled once, then evaluated chunk by chunk
+        in float32 by one kernel that returns every index, so no stacked
+        array of indices nor full-cube scaled copy of the bands is created.
+
+        Args:
+            bands (dict): generic band names mapped to xr.DataArray.
+            constants (dict): generic constant names mapped to their values.
+            indices_to_compute (list): short names of the indices.
+            scale_factor (float): scale factor of the reflectances.
+            packing (dict or None): scaled-integer output parameters
+                (see ``_quantize``), None for float32 output.
+
+        Returns:
+            xr.Dataset: one variable per index.
+        """
+        import spyndex
+
+        codes = [compile(spyndex.indices[name].formula, name, "eval")
+                 for name in indices_to_compute]
+        band_names = list(bands)
+        out_dtype = packing["dtype"] if packing else np.float32
+
+        computed = xr.apply_ufunc(
+            _fused_kernel,
+            *bands.values(),
+            kwargs={"names": band_names,
+                    "codes": codes,
+                    "constants": constants,
+                    "scale_factor": scale_factor,
+                    "packing": packing},
+            output_core_dims=[[] for _ in codes],
+            keep_attrs=False,
+            dask="parallelized",
+            output_dtypes=[out_dtype for _ in codes],
+        )
+        if len(codes) == 1:
+            computed = (computed,)
+
+        ds = xr.Dataset(dict(zip(indices_to_compute, computed)))
+        for var_name in ds.data_vars:
+            ds[var_name].attrs["grid_mapping"] = "spatial_ref"
+            if packing:
+                ds[var_name].attrs.update(_scaled_attrs(**packing))
+        return ds
+
     def calculate_indices(self, indices_to_compute: str | list[str],
                           band_mapping: dict = None,
-                          scale_factor: float = 10000):
+                          scale_factor: float = 10000,
+                          engine: str = "spyndex",
+                          constants: dict = None,
+                          dtype: str = None,
+                          int_scale: float = 10000,
+                          nodata: int = -32768):
         """
         Calculates one or more spectral indices from the input data array.
 
@@ -78,22 +132,56 @@ class SpectralIndex:
                 (e.g., {'R': 'B04', 'N': 'B08'}).
                 If None, the function assumes that the band names in `xr.Dataset`
                 directly match the generic band names expected by `spyndex`.
+            scale_factor (float, optional): reflectance scale factor.
+                Defaults to 10000.
+            engine (str, optional): computation engine. Defaults to 'spyndex'.
+                - 'spyndex': ``spyndex.computeIndex`` on the full arrays.
+                - 'fused': compiled formulas evaluated in one float32 pass
+                  per chunk for all the indices.
+            constants (dict, optional): values of spyndex constants
+                (e.g., {'L': 0.5}). Constants which are neither given here
+                nor mapped to a band take the spyndex default value.
+            dtype (str, optional): integer output type (e.g. 'int16').
+                Defaults to None, i.e. float output. With an integer type, the
+                indices are stored as ``round(value * int_scale)`` with CF
+                attributes (``scale_factor``, ``add_offset``, ``_FillValue``),
+                so they are decoded back to floats when read from NetCDF.
+            int_scale (float, optional): scale applied to the indices before
+                the conversion to integers. Defaults to 10000.
+            nodata (int, optional): integer value of invalid pixels.
+                Defaults to -32768.
 
         Returns:
             xarray.Dataset: Returns an xarray.Dataset. The calculated index
-                values will have NaNs where division by zero or other invalid 
-                operations occurred.
+                values will have NaNs (or ``nodata`` with an integer ``dtype``)
+                where division by zero or other invalid operations occurred.
+
+        Example:
+            >>> si = SpectralIndex(stacObj.cube, {'R': 'B04', 'N': 'B08'})
+            >>> ndvi = si.calculate_indices('NDVI', engine='fused', dtype='int16')
         """
+        import spyndex
 
         # Ensure indices_to_compute is a list for consistent processing
         if isinstance(indices_to_compute, str):
             indices_to_compute = [indices_to_compute]
         if band_mapping is not None:
             self.band_mapping = band_mapping
+        if engine not in ("spyndex", "fused"):
+            raise ValueError(f"Invalid engine '{engine}'. Choose 'spyndex' or 'fused'.")
+        constants = constants or {}
+        packing = None
+        if dtype is not None:
+            packing = {"int_scale": int_scale, "nodata": nodata,
+                       "dtype": np.dtype(dtype)}
+            if packing["dtype"].kind not in "iu":
+                raise ValueError(f"Invalid dtype '{dtype}'. Choose an integer type.")
 
         # Prepare parameters for spyndex.computeIndex
         # This dictionary will hold the xarray.DataArray for each required band
         spyndex_params = {}
+        bands = {}
+        constant_params = {}
 
         # Iterate through each requested index to determine all unique required bands
         all_required_generic_bands = set()
@@ -108,9 +196,18 @@ class SpectralIndex:
                                  f"Available indices: {', '.join(spyndex.indices.keys())}")
 
         # Populate the spyndex_params dictionary with actual band data
-        for generic_band_name in all_required_generic_bands:
+        for generic_band_name in sorted(all_required_generic_bands):
+            # Constants (e.g. 'L' for SAVI) are not read from the dataset
+            if generic_band_name in constants:
+                constant_params[generic_band_name] = constants[generic_band_name]
+                continue
+            if (generic_band_name not in self.band_mapping
+                    and generic_band_name in spyndex.constants):
+                constant_params[generic_band_name] = spyndex.constants[generic_band_name].default
+                continue
+
             # Determine the actual band name in the input data_array
-            actual_band_name = self.band_mapping.get(generic_band_name)
+            actual_band_name = self.band_mapping.get(generic_band_name, generic_band_name)
             # Check if the actual band exists in the data_array
             if actual_band_name not in self.dataset.data_vars.keys():
                 # Provide a helpful error message indicating what was expected vs. found
@@ -123,8 +220,18 @@ class SpectralIndex:
                     f"{expected_msg} \nAvailable bands in data_array: {self.dataset.data_vars.keys()}"
                 )
 
-            # Select the band data and add it to the parameters for spyndex
-            spyndex_params[generic_band_name] = self.dataset[actual_band_name] / scale_factor
+            if engine == "fused":
+                bands[generic_band_name] = self.dataset[actual_band_name]
+            else:
+                # Select the band data and add it to the parameters for spyndex
+                spyndex_params[generic_band_name] = self.dataset[actual_band_name] / scale_factor
+
+        if engine == "fused":
+            return self.__fused_indices(bands, constant_params,
+                                        indices_to_compute, scale_factor,
+                                        packing)
+
+        spyndex_params.update(constant_params)
 
         # Perform the calculation using spyndex
         # Using np.errstate to suppress warnings for division by zero or invalid operations,
@@ -141,4 +248,91 @@ class SpectralIndex:
         computed_indices_ds = self.__da2ds(computed_indices,
                                            indices_to_compute)
 
-        return computed_indices_ds
\ No newline at end of file
+        if packing:
+            for index_name in indices_to_compute:
+                packed = xr.apply_ufunc(_quantize,
+                                        computed_indices_ds[index_name],
+                                        kwargs=packing,
+                                        keep_attrs=True,
+                                        dask="parallelized",
+                                        output_dtypes=[packing["dtype"]])
+                packed.attrs.update(_scaled_attrs(**packing))
+                computed_indices_ds[index_name] = packed
+
+        return computed_indices_ds
+
+
+def _scaled_attrs(int_scale, nodata, dtype):
+    """
+    CF attributes of a scaled-integer variable.
+
+    Args:
+        int_scale (float): scale applied before the conversion to integers.
+        nodata (int): integer value of invalid pixels.
+        dtype (np.dtype): integer type.
+
+    Returns:
+        dict: ``scale_factor``, ``add_offset`` and ``_FillValue`` attributes.
+    """
+    return {"scale_factor": np.float32(1.0 / int_scale),
+            "add_offset": np.float32(0.0),
+            "_FillValue": np.asarray(nodata, dtype=dtype)[()]}
+
+
+def _quantize(arr, int_scale, nodata, dtype):
+    """
+    Convert float values to scaled integers.
+
+    Args:
+        arr (np.ndarray): float values.
+        int_scale (float): scale applied before the conversion to integers.
+        nodata (int): integer value given to NaNs.
+        dtype (np.dtype): integer type.
+
+    Returns:
+        np.ndarray: ``round(arr * int_scale)`` clipped to the valid range
+            of ``dtype`` (``nodata`` excluded).
+    """
+    info = np.iinfo(dtype)
+    low = info.min + 1 if nodata == info.min else info.min
+    high = info.max - 1 if nodata == info.max else info.max
+    scaled = np.rint(arr * np.float32(int_scale))
+    invalid = ~np.isfinite(scaled)
+    np.clip(scaled, low, high, out=scaled)
+    scaled[invalid] = nodata
+    return scaled.astype(dtype)
+
+
+def _fused_kernel(*bands, names, codes, constants, scale_factor, packing=None):
+    """
+    Evaluate compiled spectral index formulas on one chunk of bands.
+
+    Args:
+        *bands (np.ndarray): chunks of the bands, in the order of ``names``.
+        names (list): generic band names.
+        codes (list): compiled formulas (see ``compile``).
+        constants (dict): generic constant names mapped to their values.
+        scale_factor (float): scale factor of the reflectances.
+        packing (dict, optional): scaled-integer output parameters
+            (see ``_quantize``). Defaults to None (float32 output).
+
+    Returns:
+        np.ndarray or tuple: one array per formula, NaN (or ``nodata``)
+            where the formula is not finite.
+    """
+    scale = np.float32(1.0 / scale_factor)
+    params = dict(constants)
+    for name, arr in zip(names, bands):
+        params[name] = np.multiply(arr, scale, dtype=np.float32)
+
+    outputs = []
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        for code in codes:
+            out = np.asarray(eval(code, {"__builtins__": {}}, params),
+                             dtype=np.float32)
+            if packing:
+                out = _quantize(out, **packing)
+            else:
+                out[~np.isfinite(out)] = np.nan
+            outputs.append(out)
+    return outputs[0] if len(outputs) == 1 else tuple(outputs)
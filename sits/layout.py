@@ -0,0 +1,173 @@
+import xarray as xr
+
+
+PIXEL_CHUNK = 64
+DATE_CHUNK = 612
+
+
+def _spatial_dims(obj, dim):
+    return [d for d in obj.dims if d != dim]
+
+
+def pixel_major(obj, chunk_size=PIXEL_CHUNK, dim='time'):
+    """
+    Lazily rechunk a cube so that every pixel time series is contiguous.
+
+    Chunks hold the full time series of small spatial tiles, which suits
+    per-pixel operations (ClearCut, forecasting, smoothing, plots of points).
+
+    Args:
+        obj (xr.Dataset or xr.DataArray): time series cube ('time', 'y', 'x').
+        chunk_size (int, optional): size of the spatial chunks. Defaults to 64.
+        dim (str, optional): name of the time dimension. Defaults to 'time'.
+
+    Returns:
+        xr.Dataset or xr.DataArray: rechunked cube (dask-backed).
+
+    Example:
+        >>> ndvi = pixel_major(stacObj.indices)
+    """
+    chunks = {d: chunk_size for d in _spatial_dims(obj, dim)}
+    return obj.chunk({dim: -1, **chunks})
+
+
+def date_major(obj, chunk_size=DATE_CHUNK, dim='time'):
+    """
+    Lazily rechunk a cube so that every image is contiguous.
+
+    Chunks hold one date of large spatial tiles (the layout of
+    ``StacAttack.loadCube``), which suits per-date operations (masking,
+    spectral indices, exports of images or videos).
+
+    Args:
+        obj (xr.Dataset or xr.DataArray): time series cube ('time', 'y', 'x').
+        chunk_size (int, optional): size of the spatial chunks. Defaults to 612.
+        dim (str, optional): name of the time dimension. Defaults to 'time'.
+
+    Returns:
+        xr.Dataset or xr.DataArray: rechunked cube (dask-backed).
+
+    Example:
+        >>> cube = date_major(cube)
+    """
+    chunks = {d: chunk_size for d in _spatial_dims(obj, dim)}
+    return obj.chunk({dim: 1, **chunks})
+
+
+def to_pixel_major(obj, path, chunk_size=PIXEL_CHUNK, dim='time'):
+    """
+    Write a time-contiguous copy of a cube to a Zarr store.
+
+    The rechunking is done by dask while writing, chunk by chunk, so the
+    cube is never held in memory as a whole. Per-pixel reads of the copy
+    touch a single chunk instead of one chunk per date.
+
+    Args:
+        obj (xr.Dataset or xr.DataArray): time series cube ('time', 'y', 'x').
+        path (str): output Zarr store.
+        chunk_size (int, optional): size of the spatial chunks. Defaults to 64.
+        dim (str, optional): name of the time dimension. Defaults to 'time'.
+
+    Returns:
+        xr.Dataset or xr.DataArray: the copy, lazily opened from the store.
+
+    Example:
+        >>> ndvi = to_pixel_major(stacObj.indices, 'ndvi_pixels.zarr')
+    """
+    name = None
+    if isinstance(obj, xr.DataArray):
+        name = obj.name if obj.name is not None else '__xarray_dataarray_variable__'
+        obj = obj.to_dataset(name=name)
+
+    ds = pixel_major(obj, chunk_size, dim)
+    # chunking of the source store would override the new one
+    for var in ds.variables.values():
+        var.encoding = {k: v for k, v in var.encoding.items()
+                        if k not in ('chunks', 'preferred_chunks', 'zarr_format')}
+    ds.to_zarr(path, mode='w')
+
+    ds = xr.open_zarr(path, decode_coords='all')
+    return ds if name is None else ds[name]
+
+
+@xr.register_dataarray_accessor('layout')
+@xr.register_dataset_accessor('layout')
+class LayoutAccessor:
+    """
+    Chunk layout of a cube, available as ``obj.layout`` once ``sits.layout``
+    is imported.
+
+    Per-pixel and per-date operations need opposite chunkings. The accessor
+    tells which one a cube has and returns the cube in the layout suited to
+    an operation, reusing the time-contiguous copy written by
+    ``export_pixel_major`` when there is one.
+
+    Example:
+        >>> from sits import layout
+        >>> ndvi = stacObj.indices
+        >>> ndvi.layout.export_pixel_major('ndvi_pixels.zarr')
+        >>> detector = ClearCut(ndvi.layout.for_pixels()['NDVI'])
+        >>> ndvi.layout.for_dates()  # the original cube
+    """
+
+    def __init__(self, obj):
+        self._obj = obj
+        self._pixel_copy = None
+
+    @property
+    def kind(self):
+        """
+        str: 'pixel' if every chunk holds full time series, 'date' if chunks
+        hold single dates, 'mixed' otherwise, None for in-memory cubes.
+        """
+        chunks = self._obj.chunksizes if isinstance(self._obj, xr.DataArray) \
+            else self._obj.chunks
+        if not chunks or 'time' not in chunks:
+            return None
+        if len(chunks['time']) == 1:
+            return 'pixel'
+        if max(chunks['time']) == 1:
+            return 'date'
+        return 'mixed'
+
+    def export_pixel_major(self, path, chunk_size=PIXEL_CHUNK):
+        """
+        Write a time-contiguous copy of the cube (see `to_pixel_major`),
+        then used by `for_pixels`.
+
+        Args:
+            path (str): output Zarr store.
+            chunk_size (int, optional): size of the spatial chunks.
+                Defaults to 64.
+
+        Returns:
+            xr.Dataset or xr.DataArray: the copy, lazily opened from the store.
+        """
+        self._pixel_copy = to_pixel_major(self._obj, path, chunk_size)
+        return self._pixel_copy
+
+    def for_pixels(self, chunk_size=PIXEL_CHUNK):
+        """
+        The cube in a time-contiguous layout: the exported copy if any, the
+        cube itself if already pixel-major, else a lazy rechunk.
+
+        Returns:
+            xr.Dataset or xr.DataArray: time-contiguous cube.
+        """
+        if self._pixel_copy is not None:
+            return self._pixel_copy
+        if self.kind == 'pixel':
+            return self._obj
+        return pixel_major(self._obj, chunk_size)
+
+    def for_dates(self, chunk_size=DATE_CHUNK):
+        """
+        The cube in a date-contiguous layout: the cube itself if already
+        date-major, else a lazy rechunk.
+
+        Returns:
+            xr.Dataset or xr.DataArray: date-contiguous cube.
+        """
+        if self.kind == 'date':
+            return self._obj
+        return date_major(self._obj, chunk_size)
@@ -2,12 +2,12 @@ import os
 import sys
 import pandas as pd
 import numpy as np
+import xarray as xr
 from datetime import datetime
 import logging
 
 # STAC API
 from pystac_client import Client
-import planetary_computer as pc
 
 # ODC tools
 import odc
@@ -27,6 +27,7 @@ import dask
 
 # Local imports
 from .indices import SpectralIndex
+from .smoothing import smooth, filter_outliers
 
 
 def def_geobox(bbox, crs_out=3035, resolution=10, shape=None):
@@ -294,13 +295,19 @@ class StacAttack:
         """
         Initialize the attributes of `StacAttack`.
         """
+        sign_inplace = sign = None
+        if provider == "mpc":
+            # imported here: only the mpc provider needs url signing
+            import planetary_computer as pc
+            sign_inplace, sign = pc.sign_inplace, pc.sign
+
         self.prov_stac = {
             "mpc": {
                 "stac": "https://planetarycomputer.microsoft.com/api/stac/v1",
                 "coll": collection,
                 "key_sat": key_sat,
-                "modifier": pc.sign_inplace,
-                "patch_url": pc.sign,
+                "modifier": sign_inplace,
+                "patch_url": sign,
             },
             "aws": {
                 "stac": "https://earth-search.aws.element84.com/v1/",
@@ -638,6 +645,33 @@ class StacAttack:
         else:
             raise ValueError(f"Invalid cube name '{cube}'. Choose 'sat' or 'indices'.")
 
+    def filter_outliers(self, method="hampel", cube="sat", **kwargs):
+        """
+        Mask the temporal outliers of every pixel of the satellite time-series
+        (see ``sits.smoothing.filter_outliers``).
+
+        Outliers are set to NaN in one chunked pass over the cube, so the
+        method is meant to run before ``StacAttack.gapfill`` or ``ClearCut``.
+
+        Args:
+            method (string, optional): filter to use. Defaults to 'hampel'.
+                Can be one of the following: 'sigma', 'iqr', 'hampel'.
+            cube (str, optional): datacube type. Defaults to 'sat'.
+                Can be one of the following: 'sat', 'indices'.
+            **kwargs: other arguments of the filter
+                (e.g. ``value`` or ``window_length``).
+
+        Example:
+            >>> stacObj.filter_outliers('hampel', window_length=5, value=3)
+            >>> stacObj.gapfill()
+        """
+        if cube == "sat":
+            self.cube = filter_outliers(self.cube, method=method, **kwargs)
+        elif cube == "indices":
+            self.indices = filter_outliers(self.indices, method=method, **kwargs)
+        else:
+            raise ValueError(f"Invalid cube name '{cube}'. Choose 'sat' or 'indices'.")
+
     def gapfill(self, method="linear", first_last=True, **kwargs):
         """
         Gap-fill NaN pixel values through the satellite time-series.
@@ -660,6 +694,116 @@ class StacAttack:
             self.cube = self.cube.bfill(dim="time")
             self.cube = self.cube.ffill(dim="time")
 
+    def smooth(self, method="whittaker", cube="sat", **kwargs):
+        """
+        Smooth every pixel of the satellite time-series (see ``sits.smoothing``).
+
+        Args:
+            method (string, optional): smoother to use. Defaults to 'whittaker'.
+                Can be one of the following: 'whittaker', 'savgol', 'rolling_median'.
+            cube (str, optional): datacube type. Defaults to 'sat'.
+                Can be one of the following: 'sat', 'indices'.
+            **kwargs: other arguments of the smoother
+                (e.g. ``lmbda`` for 'whittaker').
+
+        Example:
+            >>> stacObj.spectral_index('NDVI', {'R': 'B04', 'N': 'B08'})
+            >>> stacObj.smooth('whittaker', cube='indices', lmbda=100)
+        """
+        if cube == "sat":
+            self.cube = smooth(self.cube, method=method, **kwargs)
+        elif cube == "indices":
+            self.indices = smooth(self.indices, method=method, **kwargs)
+        else:
+            raise ValueError(f"Invalid cube name '{cube}'. Choose 'sat' or 'indices'.")
+
+    def composite(self, freq="10D", method="median", band_mapping=None):
+        """
+        Reduce the satellite time-series to regular temporal composites.
+
+        Observations are grouped into consecutive bins of ``freq`` (e.g. '10D'
+        for 10-day bins starting at the first date, 'MS' for calendar months)
+        and each bin is reduced to one image. The reduction is lazy, so on a
+        dask-backed cube every spatial chunk is streamed through the bins
+        without loading the full time-series. Empty bins are kept as NaN
+        images, so the output time axis is always regular.
+
+        Args:
+            freq (str, optional): any valid pandas frequency string.
+                Defaults to '10D'.
+            method (str, optional): compositing rule. Defaults to 'median'.
+                Can be one of the following:
+                - 'median': per-pixel median of the bin.
+                - 'mean': per-pixel mean of the bin.
+                - 'max_ndvi': per-pixel observation with the highest NDVI.
+                - 'min_cloud': whole image with the lowest ratio of masked
+                  pixels (requires ``StacAttack.mask_conf()``).
+            band_mapping (dict, optional): red and near-infrared band names
+                used by 'max_ndvi'. Defaults to {'R': 'B04', 'N': 'B08'}.
+
+        Returns:
+            xarray.Dataset: time-series of composites ``StacAttack.cube``.
+            If present, ``StacAttack.mask`` is composited accordingly.
+
+        Example:
+            >>> stacObj.mask_conf()
+            >>> stacObj.mask_apply()
+            >>> stacObj.composite(freq='MS', method='max_ndvi')
+        """
+        has_mask = hasattr(self, "mask")
+
+        if method in ("median", "mean"):
+            resampled = self.cube.resample(time=freq)
+            self.cube = getattr(resampled, method)()
+            if has_mask:
+                # a composite pixel stays masked only if all its dates are
+                self.mask = self.mask.resample(time=freq).all()
+            return
+
+        if method == "max_ndvi":
+            band_mapping = band_mapping or {"R": "B04", "N": "B08"}
+            red = self.cube[band_mapping["R"]].astype("float32")
+            nir = self.cube[band_mapping["N"]].astype("float32")
+            score = (nir - red) / (nir + red)
+        elif method == "min_cloud":
+            if not has_mask:
+                raise ValueError(
+                    "method 'min_cloud' requires a mask (see StacAttack.mask_conf())."
+                )
+            score = -self.mask.mean(dim=["x", "y"])
+        else:
+            raise ValueError(
+                f"Invalid method '{method}'. "
+                "Choose 'median', 'mean', 'max_ndvi' or 'min_cloud'."
+            )
+
+        stack = self.cube.assign(_score=score)
+        if has_mask:
+            stack = stack.assign(_mask=self.mask)
+        stack = stack.resample(time=freq).map(self.__select_best)
+
+        if has_mask:
+            self.mask = stack["_mask"] != 0
+        self.cube = stack.drop_vars(["_score", "_mask"], errors="ignore")
+
+    @staticmethod
+    def __select_best(group):
+        """
+        Keep, for each pixel, the observation of the highest ``_score``.
+
+        The selection is expressed as a lazy one-hot reduction over time,
+        so it works on dask arrays without computing the argmax first.
+
+        Args:
+            group (xarray.Dataset): time bin with a ``_score`` variable.
+
+        Returns:
+            xarray.Dataset: composite image of the bin.
+        """
+        best = group["_score"].fillna(-np.inf).argmax(dim="time")
+        position = xr.DataArray(np.arange(group.sizes["time"]), dims="time")
+        return group.where(position == best).max(dim="time")
+
     def spectral_index(
         self, indices_to_compute: str | list[str], band_mapping: dict = None, **kwargs
     ):
@@ -673,16 +817,48 @@ class StacAttack:
                 band names to spyndex's standard band names (e.g., {'R': 'B04', 'N': 'B08'}).
                 If None, it assumes your dataset's variable names are directly
                 usable by spyndex.
-            **kwargs: other arguments
+            **kwargs: other arguments of ``SpectralIndex.calculate_indices()``
+                (e.g. ``engine='fused'`` for a single float32 pass over the bands).
 
         Returns:
             xarray.Dataset: time-series image ``StacAttack.indices``.
 
         Example:
             >>> stacObj.spectral_index('NDVI', {'R': 'B04', 'N': 'B08'})
+            >>> stacObj.spectral_index(['NDVI', 'NDMI'],
+            ...                        {'R': 'B04', 'N': 'B08', 'S1': 'B11'},
+            ...                        engine='fused')
         """
         si = SpectralIndex(self.cube, band_mapping)
-        self.indices = si.calculate_indices(indices_to_compute)
+        self.indices = si.calculate_indices(indices_to_compute, **kwargs)
+
+    def extract_points(self, points, cube="sat", **kwargs):
+        """
+        Extract the time series of many points in a single vectorized read
+        (see ``sits.analysis.extract_points``).
+
+        Args:
+            points (GeoDataFrame or array-like): points, e.g. ``Csv2gdf.gdf``,
+                or an array of (x, y) coordinates.
+            cube (str, optional): datacube type. Defaults to 'sat'.
+                Can be one of the following: 'sat', 'indices'.
+            **kwargs: other arguments of ``sits.analysis.extract_points``
+                (e.g. ``id_column``, ``tolerance``).
+
+        Returns:
+            DataArray: time series of shape ('point', 'time', 'band').
+
+        Example:
+            >>> geotable.set_gdf(3035)
+            >>> samples = stacObj.extract_points(geotable.gdf, id_column='gid')
+        """
+        from .analysis import extract_points
+
+        if cube == "sat":
+            return extract_points(self.cube, points, **kwargs)
+        elif cube == "indices":
+            return extract_points(self.indices, points, **kwargs)
+        raise ValueError(f"Invalid cube name '{cube}'. Choose 'sat' or 'indices'.")
 
     def __to_df(self):
         """
@@ -738,20 +914,48 @@ class StacAttack:
             >>> stacObj.to_nc(outdir)
         """
         if cube == "sat":
+            ds = self.__pack_scaled(self.cube)
             if not filename:
-                self.cube.to_netcdf(
+                ds.to_netcdf(
                     f"{outdir}/fid-{gid}_sat_{self.arrtype}_{self.startdate}-{self.enddate}.nc"
                 )
             else:
-                self.cube.to_netcdf(f"{outdir}/{filename}")
+                ds.to_netcdf(f"{outdir}/{filename}")
 
         if cube == "indices":
+            ds = self.__pack_scaled(self.indices)
             if not filename:
-                self.indices.to_netcdf(
+                ds.to_netcdf(
                     f"{outdir}/fid-{gid}_idx_{self.arrtype}_{self.startdate}-{self.enddate}.nc"
                 )
             else:
-                self.indices.to_netcdf(f"{outdir}/{filename}")
+                ds.to_netcdf(f"{outdir}/{filename}")
+
+    @staticmethod
+    def __pack_scaled(ds):
+        """
+        Restore the integer type of scaled variables before export.
+
+        Variables carrying ``scale_factor`` and ``_FillValue`` attributes
+        (e.g. indices computed with ``dtype='int16'``) are promoted to float
+        by operations adding NaNs (masking, reindexing); NaNs are set back
+        to ``_FillValue`` so that the file holds the packed integers.
+
+        Args:
+            ds (xr.Dataset): dataset to export.
+
+        Returns:
+            xr.Dataset: dataset with integer scaled variables.
+        """
+        packed = {}
+        for name, var in ds.data_vars.items():
+            fill = var.attrs.get("_FillValue")
+            if ("scale_factor" not in var.attrs or fill is None
+                    or var.dtype.kind != "f"):
+                continue
+            fill = np.asarray(fill)
+            packed[name] = var.fillna(fill).astype(fill.dtype, keep_attrs=True)
+        return ds.assign(packed) if packed else ds
 
 
 class Labels:
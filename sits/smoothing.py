@@ -0,0 +1,463 @@
+import numpy as np
+import xarray as xr
+import bottleneck as bn
+from scipy import sparse
+from scipy.linalg import solveh_banded
+from scipy.ndimage import correlate1d
+
+
+def _difference_penalty(n, d):
+    """
+    Build the banded form of the Whittaker penalty matrix D'D.
+
+    Args:
+        n (int): length of the time series.
+        d (int): order of the differences.
+
+    Returns:
+        np.ndarray: lower banded storage of shape (d + 1, n), where
+            row k holds the k-th sub-diagonal.
+    """
+    coefs = np.diff(np.eye(d + 1), n=d, axis=0)[0]
+    D = sparse.diags(coefs, offsets=np.arange(d + 1), shape=(n - d, n))
+    DtD = (D.T @ D).todia()
+    band = np.zeros((d + 1, n))
+    for k in range(d + 1):
+        band[k, :n - k] = DtD.diagonal(-k)
+    return band
+
+
+def _banded_cholesky_solve(band, rhs):
+    """
+    Solve many symmetric positive-definite banded systems at once.
+
+    Each pixel has its own matrix (the weights differ), so the Cholesky
+    factorization runs along time with every operation vectorized over
+    the pixels (pixels are the last, contiguous axis).
+
+    Args:
+        band (np.ndarray): lower banded matrices of shape (b + 1, n, pixels).
+        rhs (np.ndarray): right-hand sides of shape (n, pixels).
+
+    Returns:
+        np.ndarray: solutions of shape (n, pixels), NaN where a matrix is
+            not positive definite (i.e. too few valid observations).
+    """
+    nband, n, _ = band.shape
+    b = nband - 1
+    L = np.zeros_like(band)
+    tmp = np.empty_like(rhs[0])
+    with np.errstate(invalid='ignore', divide='ignore'):
+        for j in range(n):
+            diag = L[0, j]
+            diag[:] = band[0, j]
+            for m in range(1, min(b, j) + 1):
+                np.multiply(L[m, j - m], L[m, j - m], out=tmp)
+                diag -= tmp
+            diag[~(diag > 0)] = np.nan
+            np.sqrt(diag, out=diag)
+            for k in range(1, min(b, n - 1 - j) + 1):
+                val = L[k, j]
+                val[:] = band[k, j]
+                for m in range(1, min(b - k, j) + 1):
+                    np.multiply(L[k + m, j - m], L[m, j - m], out=tmp)
+                    val -= tmp
+                val /= diag
+
+        # forward (L z = rhs) then backward (L' x = z) substitution
+        x = rhs.copy()
+        for j in range(n):
+            for m in range(1, min(b, j) + 1):
+                np.multiply(L[m, j - m], x[j - m], out=tmp)
+                x[j] -= tmp
+            x[j] /= L[0, j]
+        for j in range(n - 1, -1, -1):
+            for k in range(1, min(b, n - 1 - j) + 1):
+                np.multiply(L[k, j], x[j + k], out=tmp)
+                x[j] -= tmp
+            x[j] /= L[0, j]
+    return x
+
+
+def _solve_intercept(lhs, rhs):
+    """
+    Intercepts of many small symmetric linear systems.
+
+    Gaussian elimination written entry by entry, each entry being an array
+    over all the samples, which avoids a LAPACK call per sample.
+
+    Args:
+        lhs (list): nested list (order x order) of arrays.
+        rhs (list): list (order) of arrays.
+
+    Returns:
+        np.ndarray: first component of the solutions.
+    """
+    order = len(rhs)
+    A = [[np.array(lhs[q][r], dtype=float) for r in range(order)] for q in range(order)]
+    b = [np.array(v, dtype=float) for v in rhs]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        for i in range(order):
+            for k in range(i + 1, order):
+                f = A[k][i] / A[i][i]
+                for j in range(i + 1, order):
+                    A[k][j] -= f * A[i][j]
+                b[k] -= f * b[i]
+        x = [None] * order
+        for i in range(order - 1, -1, -1):
+            val = b[i]
+            for j in range(i + 1, order):
+                val -= A[i][j] * x[j]
+            x[i] = val / A[i][i]
+    return x[0]
+
+
+def whittaker(arr, lmbda=10.0, d=2, weights=None):
+    """
+    Whittaker smoother applied along the last axis of an array.
+
+    NaNs get a zero weight, so gaps are filled by the smoother. Pixels
+    without gaps share a single banded factorization; pixels with gaps
+    are solved together with a banded Cholesky vectorized over pixels.
+
+    Args:
+        arr (np.ndarray): time series, time being the last axis.
+        lmbda (float, optional): smoothing parameter. Defaults to 10.
+        d (int, optional): order of the differences. Defaults to 2.
+        weights (np.ndarray, optional): observation weights with the same
+            shape as ``arr``. Defaults to None (equal weights).
+
+    Returns:
+        np.ndarray: smoothed time series (float64), NaN for series with
+            fewer than ``d`` valid observations.
+
+    Example:
+        >>> smoothed = whittaker(ndvi_values, lmbda=100)
+    """
+    arr = np.asarray(arr, dtype=float)
+    shape = arr.shape
+    n = shape[-1]
+    y = arr.reshape(-1, n)
+    valid = np.isfinite(y)
+    w = valid.astype(float)
+    if weights is not None:
+        w *= np.nan_to_num(np.asarray(weights, dtype=float).reshape(-1, n))
+    y = np.where(valid, y, 0.0)
+
+    penalty = lmbda * _difference_penalty(n, d)
+    out = np.full(y.shape, np.nan)
+
+    uniform = np.all(w == 1.0, axis=1)
+    if uniform.any():
+        band = penalty.copy()
+        band[0] += 1.0
+        if n <= 512:
+            # the smoother matrix is shared: one matrix product for all pixels
+            hat = solveh_banded(band, np.eye(n), lower=True)
+            out[uniform] = y[uniform] @ hat
+        else:
+            out[uniform] = solveh_banded(band, y[uniform].T, lower=True).T
+
+    rest = ~uniform & (np.count_nonzero(w, axis=1) >= d)
+    if rest.any():
+        w_rest = w[rest].T
+        band = np.repeat(penalty[:, :, None], w_rest.shape[1], axis=2)
+        band[0] += w_rest
+        out[rest] = _banded_cholesky_solve(band, w_rest * y[rest].T).T
+
+    return out.reshape(shape)
+
+
+def savgol(arr, window_length=7, polyorder=2):
+    """
+    Savitzky-Golay filter applied along the last axis of an array.
+
+    The local polynomial is fitted by weighted least squares in which NaNs
+    get a zero weight, so the filter works on gappy series and fills gaps
+    having enough valid neighbours. All the moment sums are obtained by
+    convolution over the whole array.
+
+    Args:
+        arr (np.ndarray): time series, time being the last axis.
+        window_length (int, optional): odd number of dates in the moving
+            window. Defaults to 7.
+        polyorder (int, optional): order of the local polynomial.
+            Defaults to 2.
+
+    Returns:
+        np.ndarray: smoothed time series (float64), NaN where the window
+            holds fewer than ``polyorder + 1`` valid observations.
+
+    Example:
+        >>> smoothed = savgol(ndvi_values, window_length=9, polyorder=2)
+    """
+    if window_length % 2 == 0 or window_length <= polyorder:
+        raise ValueError("window_length must be odd and greater than polyorder.")
+
+    arr = np.asarray(arr, dtype=float)
+    valid = np.isfinite(arr)
+    w = valid.astype(float)
+    wy = np.where(valid, arr, 0.0)
+
+    half = window_length // 2
+    offsets = np.arange(-half, half + 1, dtype=float)
+    order = polyorder + 1
+
+    moments = [correlate1d(w, offsets ** m, axis=-1, mode='constant')
+               for m in range(2 * polyorder + 1)]
+    rhs = [correlate1d(wy, offsets ** m, axis=-1, mode='constant')
+           for m in range(order)]
+    lhs = [[moments[q + r] for r in range(order)] for q in range(order)]
+
+    enough = moments[0] >= order
+    coefs = _solve_intercept(lhs, rhs)
+
+    return np.where(enough, coefs, np.nan)
+
+
+def rolling_median(arr, window_length=3):
+    """
+    Centred moving median applied along the last axis of an array.
+
+    Args:
+        arr (np.ndarray): time series, time being the last axis.
+        window_length (int, optional): odd number of dates in the moving
+            window. Defaults to 3.
+
+    Returns:
+        np.ndarray: filtered time series (float64), NaNs being ignored.
+
+    Example:
+        >>> filtered = rolling_median(ndvi_values, window_length=5)
+    """
+    if window_length % 2 == 0:
+        raise ValueError("window_length must be odd.")
+
+    arr = np.asarray(arr, dtype=float)
+    half = window_length // 2
+    pad = np.full(arr.shape[:-1] + (half,), np.nan)
+    trailing = bn.move_median(np.concatenate([arr, pad], axis=-1),
+                              window=window_length, min_count=1, axis=-1)
+    return trailing[..., half:]
+
+
+SMOOTHERS = {
+    'whittaker': whittaker,
+    'savgol': savgol,
+    'rolling_median': rolling_median,
+}
+
+
+def smooth(obj, method='whittaker', dim='time', **kwargs):
+    """
+    Smooth every pixel time series of an xarray object.
+
+    The smoother is applied chunk-wise through ``xarray.apply_ufunc``:
+    dask-backed objects are rechunked to hold the full time series in one
+    chunk and are processed lazily, one spatial chunk at a time.
+
+    Args:
+        obj (xr.Dataset or xr.DataArray): time series ('time', 'y', 'x').
+        method (str, optional): smoother to use. Defaults to 'whittaker'.
+            Can be one of the following: 'whittaker', 'savgol', 'rolling_median'.
+        dim (str, optional): name of the time dimension. Defaults to 'time'.
+        **kwargs: arguments of the smoother (e.g. ``lmbda`` for 'whittaker',
+            ``window_length`` and ``polyorder`` for 'savgol').
+
+    Returns:
+        xr.Dataset or xr.DataArray: smoothed time series (float64).
+
+    Example:
+        >>> ndvi_smooth = smooth(stacObj.indices, 'whittaker', lmbda=100)
+    """
+    if method not in SMOOTHERS:
+        raise ValueError(f"Invalid method '{method}'. "
+                         f"Choose one of {list(SMOOTHERS)}.")
+
+    if obj.chunks:
+        obj = obj.chunk({dim: -1})
+
+    return xr.apply_ufunc(
+        SMOOTHERS[method],
+        obj,
+        input_core_dims=[[dim]],
+        output_core_dims=[[dim]],
+        kwargs=kwargs,
+        keep_attrs=True,
+        dask='parallelized',
+        output_dtypes=[float],
+    ).transpose(*obj.dims)
+
+
+def _nanquantile(arr, q):
+    """
+    Linear quantile along the last axis ignoring NaNs, as
+    ``np.nanquantile`` but vectorized over all the series at once.
+    """
+    values = np.sort(arr, axis=-1)  # NaNs are sorted last
+    count = np.count_nonzero(np.isfinite(arr), axis=-1)
+    pos = np.maximum(count - 1, 0) * q
+    lo = np.floor(pos).astype(int)
+    hi = np.minimum(lo + 1, np.maximum(count - 1, 0))
+    frac = pos - lo
+    v_lo = np.take_along_axis(values, lo[..., None], axis=-1)[..., 0]
+    v_hi = np.take_along_axis(values, hi[..., None], axis=-1)[..., 0]
+    return np.where(count > 0, v_lo + frac * (v_hi - v_lo), np.nan)
+
+
+def _outlier_bounds(arr, method='iqr', value=1.5):
+    """
+    Lower and upper bounds of the valid values of many time series, the
+    statistics being computed along the last axis.
+
+    Args:
+        arr (np.ndarray): time series, time being the last axis.
+        method (str): 'sigma' (mean +/- value * std) or
+            'iqr' (Q1 - value * IQR, Q3 + value * IQR).
+        value (float): multiplier of the std or of the IQR.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: lower and upper bounds, shaped as
+            ``arr`` without its last axis.
+    """
+    with np.errstate(invalid='ignore'):
+        if method == 'sigma':
+            mean, std = bn.nanmean(arr, axis=-1), bn.nanstd(arr, axis=-1)
+            return mean - value * std, mean + value * std
+        if method == 'iqr':
+            q1, q3 = _nanquantile(arr, 0.25), _nanquantile(arr, 0.75)
+            return q1 - value * (q3 - q1), q3 + value * (q3 - q1)
+    raise ValueError(f"Invalid method '{method}'. Choose 'sigma' or 'iqr'.")
+
+
+def sigma_filter(arr, value=3.0):
+    """
+    Mask the values further than ``value`` standard deviations from the
+    mean of their time series, along the last axis of an array.
+
+    Args:
+        arr (np.ndarray): time series, time being the last axis.
+        value (float, optional): multiplier of the standard deviation.
+            Defaults to 3.
+
+    Returns:
+        np.ndarray: time series (float64) with the outliers set to NaN.
+
+    Example:
+        >>> filtered = sigma_filter(ndvi_values, value=2.5)
+    """
+    arr = np.asarray(arr, dtype=float)
+    lower, upper = _outlier_bounds(arr, 'sigma', value)
+    outliers = (arr < lower[..., None]) | (arr > upper[..., None])
+    return np.where(outliers, np.nan, arr)
+
+
+def iqr_filter(arr, value=1.5):
+    """
+    Mask the values outside [Q1 - value * IQR, Q3 + value * IQR] of their
+    time series, along the last axis of an array.
+
+    Args:
+        arr (np.ndarray): time series, time being the last axis.
+        value (float, optional): multiplier of the interquartile range.
+            Defaults to 1.5.
+
+    Returns:
+        np.ndarray: time series (float64) with the outliers set to NaN.
+
+    Example:
+        >>> filtered = iqr_filter(ndvi_values)
+    """
+    arr = np.asarray(arr, dtype=float)
+    lower, upper = _outlier_bounds(arr, 'iqr', value)
+    outliers = (arr < lower[..., None]) | (arr > upper[..., None])
+    return np.where(outliers, np.nan, arr)
+
+
+def hampel(arr, window_length=7, value=3.0):
+    """
+    Hampel despiker applied along the last axis of an array.
+
+    A value is an outlier when it is further than ``value`` scaled median
+    absolute deviations (MAD x 1.4826) from the median of the centred
+    moving window. NaNs are ignored and the window is truncated at the
+    edges of the series.
+
+    Args:
+        arr (np.ndarray): time series, time being the last axis.
+        window_length (int, optional): odd number of dates in the moving
+            window. Defaults to 7.
+        value (float, optional): threshold in scaled MADs. Defaults to 3.
+
+    Returns:
+        np.ndarray: time series (float64) with the outliers set to NaN.
+
+    Example:
+        >>> despiked = hampel(ndvi_values, window_length=5)
+    """
+    if window_length % 2 == 0:
+        raise ValueError("window_length must be odd.")
+
+    arr = np.asarray(arr, dtype=float)
+    half = window_length // 2
+    pad = [(0, 0)] * (arr.ndim - 1) + [(half, half)]
+    windows = np.lib.stride_tricks.sliding_window_view(
+        np.pad(arr, pad, constant_values=np.nan), window_length, axis=-1)
+
+    median = bn.nanmedian(windows, axis=-1)
+    deviation = np.abs(arr - median)
+    mad = 1.4826 * bn.nanmedian(np.abs(windows - median[..., None]), axis=-1)
+
+    with np.errstate(invalid='ignore'):
+        outliers = deviation > value * mad
+    return np.where(outliers, np.nan, arr)
+
+
+OUTLIER_FILTERS = {
+    'sigma': sigma_filter,
+    'iqr': iqr_filter,
+    'hampel': hampel,
+}
+
+
+def filter_outliers(obj, method='hampel', dim='time', **kwargs):
+    """
+    Mask the temporal outliers of every pixel time series of an xarray object.
+
+    The filter is applied in one chunk-wise pass through
+    ``xarray.apply_ufunc``, as `smooth`: dask-backed objects are rechunked
+    to hold the full time series in one chunk and are processed lazily.
+    Outliers are set to NaN, so they can then be filled by
+    ``StacAttack.gapfill`` or skipped by ``ClearCut``.
+
+    Args:
+        obj (xr.Dataset or xr.DataArray): time series ('time', 'y', 'x').
+        method (str, optional): filter to use. Defaults to 'hampel'.
+            Can be one of the following: 'sigma', 'iqr', 'hampel'.
+        dim (str, optional): name of the time dimension. Defaults to 'time'.
+        **kwargs: arguments of the filter (``value`` for all of them,
+            ``window_length`` for 'hampel').
+
+    Returns:
+        xr.Dataset or xr.DataArray: time series (float64) without outliers.
+
+    Example:
+        >>> ndvi = filter_outliers(stacObj.indices, 'iqr', value=1.5)
+    """
+    if method not in OUTLIER_FILTERS:
+        raise ValueError(f"Invalid method '{method}'. "
+                         f"Choose one of {list(OUTLIER_FILTERS)}.")
+
+    if obj.chunks:
+        obj = obj.chunk({dim: -1})
+
+    return xr.apply_ufunc(
+        OUTLIER_FILTERS[method],
+        obj,
+        input_core_dims=[[dim]],
+        output_core_dims=[[dim]],
+        kwargs=kwargs,
+        keep_attrs=True,
+        dask='parallelized',
+        output_dtypes=[float],
+    ).transpose(*obj.dims)
@@ -0,0 +1,423 @@
+"""
+Tests of the change detection tools on synthetic time series.
+"""
+
+import os
+import warnings
+
+import numpy as np
+import pandas as pd
+import pytest
+import xarray as xr
+
+from sits.analysis import ClearCut, FLAG_ANOMALY, FLAG_INRANGE, sieve_maj
+
+
+def _ndvi_series(n_dates=60, shape=(2, 3), seed=0, gaps=0.0):
+    """NDVI-like series ('time', 'band', 'y', 'x') with a drop on the first row."""
+    rng = np.random.default_rng(seed)
+    time = pd.date_range("2020-01-01", periods=n_dates, freq="12D")
+    values = rng.normal(0.7, 0.02, (n_dates, 1) + shape)
+    values[n_dates // 2:, :, 0, :] -= 0.4
+    values[rng.random(values.shape) < gaps] = np.nan
+    return xr.DataArray(values, dims=("time", "band", "y", "x"),
+                        coords={"time": time})
+
+
+def _reference_magnitude(series, times, pivot, window_b, window_f, min_b, min_f):
+    """Window means computed date by date, extending short windows."""
+    def mean(idx, min_obs):
+        vals = series[idx]
+        vals = vals[np.isfinite(vals)]
+        return vals.mean() if len(vals) >= min_obs else np.nan
+
+    d = times[pivot]
+    back = np.flatnonzero((times >= d - np.timedelta64(window_b, "D")) & (times <= d))
+    forw = np.flatnonzero((times >= d) & (times <= d + np.timedelta64(window_f, "D")))
+    before, after = mean(back, min_b), mean(forw, min_f)
+    if np.isnan(before):
+        valid = np.flatnonzero(np.isfinite(series[:pivot + 1]))
+        before = series[valid[-min_b:]].mean() if len(valid) >= min_b else np.nan
+    if np.isnan(after):
+        valid = pivot + np.flatnonzero(np.isfinite(series[pivot:]))
+        after = series[valid[:min_f]].mean() if len(valid) >= min_f else np.nan
+    return after - before
+
+
+def test_detect_anomalies_matches_reference():
+    """Test the vectorized window means, with fallback, against a date loop"""
+    da = _ndvi_series(gaps=0.3)
+    detector = ClearCut(da)
+    detector.detect_anomalies(window_backward=120, window_forward=36,
+                              min_obs_backward=5, min_obs_forward=3,
+                              store_magnitude=True)
+
+    times = da.time.values
+    mags = detector.magnitude_ts
+    for y in range(da.sizes["y"]):
+        for x in range(da.sizes["x"]):
+            series = da.values[:, 0, y, x]
+            for k, d in enumerate(mags.time.values):
+                pivot = int(np.flatnonzero(times == d)[0])
+                expected = _reference_magnitude(series, times, pivot, 120, 36, 5, 3)
+                np.testing.assert_allclose(mags.values[k, 0, y, x], expected)
+
+
+@pytest.mark.parametrize("anomaly_type", ["absolute", "drop"])
+def test_detect_anomalies_finds_drop(anomaly_type):
+    """Test that the drop is flagged on the first row only"""
+    da = _ndvi_series()
+    thresholds = [-0.2, -0.3] if anomaly_type == "drop" else [0.2, 0.3]
+    detector = ClearCut(da)
+    detector.detect_anomalies(thresholds=thresholds, anomaly_type=anomaly_type,
+                              window_backward=120, window_forward=36,
+                              min_obs_backward=5, min_obs_forward=3)
+    det = detector.detection.squeeze("band")
+
+    mask = (det.flags & FLAG_ANOMALY) > 0
+    assert mask[0].all() and not mask[1].any()
+    assert ((det.flags & FLAG_INRANGE) > 0).all()
+    assert det.classif.dtype == np.uint8 and (det.classif[0] == 2).all()
+    assert det.date_max.dtype == np.int16
+    assert (det.date_max[1] == det.date_max.attrs["nodata"]).all()
+    drop_day = (da.time.values[30] - np.datetime64("1970-01-01")) // np.timedelta64(1, "D")
+    assert (det.date_max[0] <= drop_day).all()
+    assert (det.date_last[0] >= det.date_first[0]).all()
+    np.testing.assert_allclose(det.magnitude_max[0], -0.4, atol=0.05)
+
+
+def test_detect_anomalies_dask_matches_numpy():
+    """Test the lazy chunk-wise detection against the in-memory one"""
+    da = _ndvi_series(shape=(6, 5), gaps=0.2)
+    eager = ClearCut(da)
+    eager.detect_anomalies(window_backward=120, window_forward=36,
+                           store_magnitude=True)
+    lazy = ClearCut(da.chunk({"time": 10, "y": 3, "x": 2}))
+    lazy.detect_anomalies(window_backward=120, window_forward=36,
+                          store_magnitude=True)
+
+    assert lazy.detection["magnitude_max"].chunks is not None
+    xr.testing.assert_identical(lazy.detection.compute(), eager.detection)
+    xr.testing.assert_identical(lazy.magnitude_ts.compute(), eager.magnitude_ts)
+
+
+@pytest.mark.parametrize("filename", ["magnitude.nc", "magnitude.zarr"])
+def test_detect_anomalies_magnitude_store(filename, tmp_path):
+    """Test the magnitudes written to disk with the detection"""
+    if filename.endswith(".zarr"):
+        pytest.importorskip("zarr")
+    da = _ndvi_series(gaps=0.2)
+    kwargs = dict(window_backward=120, window_forward=36)
+    reference = ClearCut(da)
+    reference.detect_anomalies(store_magnitude=True, **kwargs)
+    detector = ClearCut(da.chunk({"y": 1}))
+    detector.detect_anomalies(store_magnitude=str(tmp_path / filename), **kwargs)
+
+    assert (tmp_path / filename).exists()
+    assert detector.magnitude_ts.chunks is not None
+    xr.testing.assert_allclose(detector.magnitude_ts.drop_vars("spatial_ref"),
+                               reference.magnitude_ts)
+    xr.testing.assert_allclose(detector.detection, reference.detection)
+
+
+def test_detect_anomalies_sparse_magnitude():
+    """Test that the sparse magnitudes keep the flagged dates only"""
+    da = _ndvi_series(gaps=0.2)
+    kwargs = dict(thresholds=[0.2], window_backward=120, window_forward=36)
+    dense = ClearCut(da.chunk({"y": 1}))
+    dense.detect_anomalies(store_magnitude=True, **kwargs)
+    sparse = ClearCut(da)
+    sparse.detect_anomalies(store_magnitude=True, magnitude_sparse=True, **kwargs)
+
+    flagged = abs(dense.magnitude_ts) > 0.2
+    xr.testing.assert_equal(sparse.magnitude_ts, dense.magnitude_ts.where(flagged))
+
+
+def test_update_from_state_matches_full_detection(tmp_path):
+    """Test the incremental detection against a run on the full series"""
+    da = _ndvi_series(n_dates=90, shape=(4, 3), gaps=0.35)
+    da[55:70, 0, 2, :] = np.nan
+    kwargs = dict(window_backward=120, window_forward=36,
+                  min_obs_backward=5, min_obs_forward=3)
+    full = ClearCut(da)
+    full.detect_anomalies(**kwargs)
+
+    detector = ClearCut(da.isel(time=slice(0, 50)).chunk({"y": 2}))
+    detector.detect_anomalies(**kwargs)
+    detector.get_state().to_netcdf(tmp_path / "state.nc")
+
+    detector = ClearCut.from_state(tmp_path / "state.nc")
+    detector.update(da.isel(time=slice(50, 63)))
+    detector.update(da.isel(time=slice(63, None)))
+
+    assert detector.state.sizes["time"] < da.sizes["time"] // 2
+    xr.testing.assert_allclose(detector.detection, full.detection)
+    with pytest.raises(ValueError):
+        detector.update(da.isel(time=slice(80, None)))
+
+
+def _classification(shape=(40, 50), seed=0):
+    rng = np.random.default_rng(seed)
+    values = rng.choice([0, 1, 2, 3], size=shape, p=[0.5, 0.2, 0.2, 0.1]).astype(float)
+    values[rng.random(shape) < 0.05] = np.nan
+    return xr.DataArray(values, dims=("y", "x"),
+                        coords={"y": np.arange(shape[0]), "x": np.arange(shape[1])})
+
+
+def test_sieve_maj_small_objects():
+    """Test that small objects are removed and filled by the majority"""
+    values = np.zeros((7, 7))
+    values[1:6, 1:6] = 2
+    values[3, 3] = 1          # isolated pixel inside a large object
+    values[0, 6] = 3          # isolated pixel in the background
+    da = xr.DataArray(values, dims=("y", "x"))
+
+    result = sieve_maj(da, min_size=2, window_size=3).values
+
+    assert result[3, 3] == 2
+    assert result[0, 6] == 0
+    assert (result[1:6, 1:6] == 2).all()
+
+
+@pytest.mark.parametrize("connectivity", [1, 2])
+def test_sieve_maj_tiled_matches_in_memory(connectivity):
+    """Test the dask tiled mode (halo overlap) against the whole raster"""
+    da = _classification()
+    kwargs = dict(min_size=4, window_size=3, connectivity=connectivity)
+    expected = sieve_maj(da, **kwargs)
+    tiled = sieve_maj(da.chunk({"y": 9, "x": 11}), **kwargs)
+
+    assert tiled.chunks is not None
+    xr.testing.assert_identical(tiled.compute(), expected)
+
+
+@pytest.mark.parametrize("freq, interpolate", [("D", True), ("5D", False), ("5D", True)])
+def test_xr_reindexTS_matches_reindexTS(freq, interpolate):
+    """Test the cube-level reindexing against reindexTS on each pixel"""
+    from sits.analysis import reindexTS, xr_reindexTS
+
+    da = _ndvi_series(n_dates=25, gaps=0.3).squeeze("band", drop=True)
+    da = da.assign_coords(time=da.time + np.timedelta64(10, "h"))
+
+    result = xr_reindexTS(da.chunk({"x": 2}), freq=freq,
+                          interpolate=interpolate).compute()
+
+    for y in range(da.sizes["y"]):
+        for x in range(da.sizes["x"]):
+            df = pd.DataFrame({"y": da.values[:, y, x]}, index=da.time.values)
+            expected = reindexTS(df, freq=freq, regular_freq=freq == "D",
+                                 interpolate=interpolate)["y"]
+            np.testing.assert_allclose(result.values[:, y, x], expected.values)
+    with pytest.raises(ValueError):
+        xr_reindexTS(da, freq="W")
+
+
+def test_xr_forecast_matches_pixelwise_fit():
+    """Test the chunk-wise forecast against one sktime fit per pixel"""
+    pytest.importorskip("sktime")
+    from sits.analysis import sktime_fitpred, xr_forecast
+
+    da = _ndvi_series(n_dates=20, gaps=0.2).squeeze("band", drop=True)
+    da = da.assign_coords(time=da.time + np.timedelta64(6, "h"))
+    predict_time = pd.date_range("2020-08-20", periods=5, freq="D")
+    kwargs = dict(model_name="NaiveForecaster", model_params={"strategy": "mean"},
+                  reindex_params={"regular_freq": True, "interpolate": True})
+
+    result = xr_forecast(da.chunk({"x": 2}), predict_time, **kwargs).compute()
+
+    assert result.dims == ("time", "y", "x")
+    for y in range(da.sizes["y"]):
+        for x in range(da.sizes["x"]):
+            expected = sktime_fitpred(da.values[:, y, x], da.time.values,
+                                      predict_time, **kwargs)
+            np.testing.assert_allclose(result.values[:, y, x], expected)
+    with pytest.raises(ValueError):
+        xr_forecast(da, predict_time, model_name="NotAForecaster")
+
+
+def test_xr_forecast_harmonic_matches_lstsq():
+    """Test the batched harmonic regression against a fit per pixel"""
+    from sits.analysis import _harmonic_design, xr_forecast
+
+    da = _ndvi_series(n_dates=40, shape=(3, 4), gaps=0.3).squeeze("band", drop=True)
+    da[:-3, 0, 0] = np.nan
+    predict_time = pd.date_range("2021-06-01", periods=4, freq="10D")
+
+    result = xr_forecast(da.chunk({"x": 2}), predict_time, model_name="harmonic",
+                         model_params={"degree": 1}).compute()
+
+    t = (da.time.values - da.time.values[0]) / np.timedelta64(1, "D")
+    t_pred = (predict_time.values - da.time.values[0]) / np.timedelta64(1, "D")
+    assert np.isnan(result.values[:, 0, 0]).all()
+    for y, x in [(0, 1), (1, 2), (2, 3)]:
+        series = da.values[:, y, x]
+        valid = np.isfinite(series)
+        coefs = np.linalg.lstsq(_harmonic_design(t[valid]), series[valid], rcond=None)[0]
+        np.testing.assert_allclose(result.values[:, y, x],
+                                   _harmonic_design(t_pred) @ coefs)
+
+
+def test_harmonic_regression_rasters():
+    """Test the batched coefficients, RMSE and quantiles against lstsq"""
+    from sits.analysis import _harmonic_design, harmonic_regression, xr_predict
+
+    da = _ndvi_series(n_dates=40, shape=(3, 4), gaps=0.3).squeeze("band", drop=True)
+    da[:-3, 0, 0] = np.nan
+
+    model = harmonic_regression(da.chunk({"x": 2}), degree=2,
+                                quantiles=(0.1, 0.9)).compute()
+
+    t = (da.time.values - da.time.values[0]) / np.timedelta64(1, "D")
+    assert list(model.param.values) == ["intercept", "trend", "cos1", "sin1",
+                                        "cos2", "sin2"]
+    assert np.isnan(model.rmse[0, 0])
+    for y, x in [(0, 1), (1, 2), (2, 3)]:
+        series = da.values[:, y, x]
+        valid = np.isfinite(series)
+        X = _harmonic_design(t[valid], degree=2)
+        coefs = np.linalg.lstsq(X, series[valid], rcond=None)[0]
+        res = series[valid] - X @ coefs
+        np.testing.assert_allclose(model.params.values[y, x], coefs, atol=1e-10)
+        np.testing.assert_allclose(model.rmse.values[y, x], np.sqrt(np.mean(res ** 2)))
+        np.testing.assert_allclose(model.residual_quantile.values[y, x],
+                                   np.quantile(res, [0.1, 0.9]))
+        fitted = xr_predict(model, da.time.values).values[valid, y, x]
+        np.testing.assert_allclose(fitted, series[valid] - res)
+
+
+def test_seasonal_naive_matches_sktime():
+    """Test the batched seasonal naive forecast on a daily series"""
+    sktime = pytest.importorskip("sktime.forecasting.naive")
+    from sits.analysis import seasonal_naive_forecast
+
+    y = np.random.default_rng(0).normal(size=(2, 30))
+    pred = seasonal_naive_forecast(y, np.arange(30.0), np.arange(30.0, 45.0), period=7)
+
+    index = pd.period_range("2020-01-01", periods=30, freq="D")
+    for series, result in zip(y, pred):
+        forecaster = sktime.NaiveForecaster(strategy="last", sp=7)
+        forecaster.fit(pd.Series(series, index=index))
+        np.testing.assert_allclose(result, forecaster.predict(fh=np.arange(1, 16)))
+
+
+def test_exp_smoothing_without_memory():
+    """Test that alpha=1 forecasts the last valid observation"""
+    from sits.analysis import exp_smoothing_forecast
+
+    y = np.array([[1.0, 2.0, np.nan], [np.nan, np.nan, np.nan], [4.0, np.nan, 5.0]])
+    pred = exp_smoothing_forecast(y, np.arange(3.0), np.array([5.0, 6.0]), alpha=1.0)
+    np.testing.assert_array_equal(pred, [[2.0, 2.0], [np.nan, np.nan], [5.0, 5.0]])
+    with pytest.raises(ValueError):
+        exp_smoothing_forecast(y, np.arange(3.0), np.array([5.0]), alpha=0)
+
+
+@pytest.mark.parametrize("model_name", ["harmonic", "NaiveForecaster"])
+def test_xr_forecast_process_pool(model_name):
+    """Test the block execution on a process pool against the dask path"""
+    if model_name == "NaiveForecaster":
+        pytest.importorskip("sktime")
+    from concurrent.futures import ProcessPoolExecutor
+    from sits.analysis import xr_forecast
+
+    da = _ndvi_series(n_dates=30, shape=(3, 5)).squeeze("band", drop=True)
+    predict_time = pd.date_range("2020-12-26", periods=3, freq="12D")
+    expected = xr_forecast(da, predict_time, model_name=model_name)
+
+    with ProcessPoolExecutor(max_workers=2) as pool:
+        result, timings = xr_forecast(da, predict_time, model_name=model_name,
+                                      executor=pool, block_size=4,
+                                      return_timings=True)
+
+    xr.testing.assert_identical(result, expected)
+    assert list(timings["n_pixels"]) == [4, 4, 4, 3]
+    assert (timings["seconds"] > 0).all()
+
+
+def test_xr_forecast_executor_streams_chunks():
+    """Test that the executor path reads a dask cube chunk by chunk"""
+    import dask
+    from concurrent.futures import ThreadPoolExecutor
+    from sits.analysis import xr_forecast
+
+    da = _ndvi_series(n_dates=30, shape=(6, 8)).squeeze("band", drop=True)
+    predict_time = pd.date_range("2020-12-26", periods=3, freq="12D")
+    expected = xr_forecast(da, predict_time, model_name="harmonic")
+
+    sizes = []
+
+    def recording_get(dsk, keys, **kwargs):
+        out = dask.get(dsk, keys, **kwargs)
+        sizes.extend(np.size(x) for x in dask.core.flatten(out, container=(list, tuple)))
+        return out
+
+    chunked = da.chunk({"time": 10, "y": 3, "x": 4})
+    with dask.config.set(scheduler=recording_get), ThreadPoolExecutor(2) as pool:
+        result, timings = xr_forecast(chunked, predict_time, model_name="harmonic",
+                                      executor=pool, block_size=5,
+                                      return_timings=True)
+
+    assert max(sizes) == 30 * 3 * 4
+    assert result.chunks == ((3,), (3, 3), (4, 4))
+    assert list(timings["n_pixels"]) == [5, 5, 2] * 4
+    xr.testing.assert_allclose(result.compute(), expected)
+
+
+@pytest.mark.parametrize("model_name, filename", [
+    ("harmonic", "models.nc"),
+    ("seasonal_naive", "models.zarr"),
+    ("exp_smoothing", "models.nc"),
+    ("NaiveForecaster", "models.nc"),
+    ("NaiveForecaster", "models.zarr"),
+])
+def test_xr_predict_from_stored_models(model_name, filename, tmp_path):
+    """Test predictions from persisted models against a direct forecast"""
+    if model_name == "NaiveForecaster":
+        pytest.importorskip("sktime")
+    if filename.endswith(".zarr"):
+        pytest.importorskip("zarr")
+    from sits.analysis import xr_fit, xr_forecast, xr_predict
+
+    da = _ndvi_series(n_dates=30, shape=(3, 4), gaps=0.2).squeeze("band", drop=True)
+    params = {"period": 100} if model_name == "seasonal_naive" else {}
+    with warnings.catch_warnings():
+        # object arrays would be loaded in memory to be serialized
+        warnings.simplefilter("error", xr.SerializationWarning)
+        models = xr_fit(da.chunk({"y": 2}), model_name=model_name,
+                        model_params=params, path=str(tmp_path / filename))
+    assert next(iter(models.data_vars.values())).dtype != object
+
+    for start in ["2020-12-26", "2021-02-12"]:
+        predict_time = pd.date_range(start, periods=3, freq="12D")
+        expected = xr_forecast(da, predict_time, model_name=model_name,
+                               model_params=params)
+        result = xr_predict(str(tmp_path / filename), predict_time)
+        assert result.chunks is not None
+        np.testing.assert_allclose(result.values, expected.values)
+
+
+def test_render_batch_writes_pngs(tmp_path):
+    """Test the batch rendering of several pixels on a process pool"""
+    pytest.importorskip("matplotlib")
+    from concurrent.futures import ProcessPoolExecutor
+    from datetime import datetime
+    from sits.analysis import SitsPlotter, _outlier_mask
+
+    da = _ndvi_series(n_dates=60, gaps=0.1).squeeze("band", drop=True)
+    ds = da.assign_coords(y=[0.0, 10.0], x=[0.0, 10.0, 20.0]).to_dataset(name="NDVI")
+    daterange = [datetime(2020, 1, 1), datetime(2022, 1, 1)]
+
+    with ProcessPoolExecutor(max_workers=2) as pool:
+        paths = SitsPlotter.render_batch(
+            ds, "NDVI", daterange, points=[(0, 0), (2, 1), (1, 0)],
+            output_path=str(tmp_path), break_date=datetime(2021, 1, 1),
+            filter_method="iqr", degree=1, thresholds=[0.2],
+            detection_params={"window_backward": 120, "window_forward": 36},
+            executor=pool, block_size=2)
+
+    assert [os.path.basename(p) for p in paths] == [f"sits_NDVI_{k}.png" for k in range(3)]
+    assert all(os.path.getsize(p) > 0 for p in paths)
+
+    values = np.array([[0.0, 0.1, 0.2, 5.0, 5.0], [1.0, np.nan, 1.0, 1.0, 9.0]])
+    in_fit = np.array([True, True, True, True, False])
+    np.testing.assert_array_equal(_outlier_mask(values, in_fit, "sigma", 1.5),
+                                  [[False, False, False, True, False], [False] * 5])
@@ -0,0 +1,160 @@
+"""
+Tests of the animated exports of Sits_ds on synthetic cubes.
+"""
+
+import imageio.v2 as imageio
+import numpy as np
+import pandas as pd
+import pytest
+import xarray as xr
+
+from sits.export import Sits_ds
+from test_data import create_synthetic_satellite_cube
+
+
+def _write_parts(tmp_path, time_steps=6):
+    cube = create_synthetic_satellite_cube(time_steps=time_steps,
+                                           bands=["B02", "B03", "B04"])
+    half = time_steps // 2
+    cube.isel(time=slice(None, half)).to_netcdf(tmp_path / "fid-1_sat_a.nc")
+    cube.isel(time=slice(half, None)).to_netcdf(tmp_path / "fid-1_sat_b.nc")
+    return cube
+
+
+def test_open_glob_is_lazy(tmp_path):
+    """Test that a glob of files is opened lazily as one dataset"""
+    cube = _write_parts(tmp_path)
+
+    geo_dc = Sits_ds(str(tmp_path / "fid-1_sat_*.nc"))
+
+    assert geo_dc.ds.B04.chunks[0] == (1,) * cube.sizes["time"]
+    np.testing.assert_array_equal(geo_dc.ds.B04.values, cube.B04.values)
+
+
+def test_time_interp_stays_lazy(tmp_path):
+    """Test the frame-wise linear interpolation against xarray.interp"""
+    cube = _write_parts(tmp_path).astype(float)
+    new_times = pd.date_range(cube.time.values[0], cube.time.values[-1], periods=13)
+    expected = cube.interp(time=new_times, method="slinear")
+
+    geo_dc = Sits_ds(str(tmp_path / "fid-1_sat_*.nc"))
+    geo_dc.time_interp(nb_period=13)
+
+    assert geo_dc.ds.B04.chunks[0] == (1,) * 13
+    xr.testing.assert_allclose(geo_dc.ds[list(cube.data_vars)].compute(),
+                               expected[list(cube.data_vars)])
+
+
+def test_export2vid_streams_frames(tmp_path):
+    """Test that the lazy and in-memory exports give the same frames"""
+    _write_parts(tmp_path)
+    paths = sorted(str(p) for p in tmp_path.glob("*.nc"))
+    bands = ["B04", "B03", "B02"]
+
+    Sits_ds(paths).export2vid(str(tmp_path / "lazy.gif"), bands, vmin=0, vmax=3000)
+    Sits_ds(paths, chunks=None).export2vid(str(tmp_path / "eager.gif"), bands,
+                                           vmin=0, vmax=3000)
+
+    lazy = imageio.mimread(tmp_path / "lazy.gif")
+    eager = imageio.mimread(tmp_path / "eager.gif")
+    assert len(lazy) == 6
+    np.testing.assert_array_equal(np.stack(lazy), np.stack(eager))
+
+
+def test_export2vid_pipeline_keeps_order(tmp_path):
+    """Test that the parallel rendering gives the frames of a sequential one"""
+    _write_parts(tmp_path, time_steps=10)
+    geo_dc = Sits_ds(str(tmp_path / "fid-1_sat_*.nc"))
+    options = dict(keep_bands=["B04"], colormap="magma", square=True,
+                   square_param={"dim": 32}, watermark_text="sits",
+                   watermark_param={"font_size": 8})
+
+    geo_dc.export2vid(str(tmp_path / "seq.gif"), workers=1, prefetch=1, **options)
+    geo_dc.export2vid(str(tmp_path / "par.gif"), workers=4, prefetch=3, **options)
+
+    sequential = np.stack(imageio.mimread(tmp_path / "seq.gif"))
+    parallel = np.stack(imageio.mimread(tmp_path / "par.gif"))
+    assert sequential.shape[:3] == (10, 32, 32)
+    np.testing.assert_array_equal(parallel, sequential)
+
+
+def test_band_percentiles_match_numpy(tmp_path):
+    """Test the streaming percentiles against np.nanpercentile of the cube"""
+    bands = ["B04", "B03", "B02"]
+    np.random.seed(0)
+    cube = create_synthetic_satellite_cube(width=40, height=40, time_steps=8,
+                                           bands=bands).astype(float)
+    cube = cube + np.random.default_rng(0).random(cube.B04.shape)
+    cube.B04[2, :5, :5] = np.nan
+    cube.to_netcdf(tmp_path / "cube.nc")
+
+    result = Sits_ds(str(tmp_path / "cube.nc")).band_percentiles(
+        bands, q=(0, 2, 50, 98, 100))
+
+    values = cube[bands].to_array("band").values
+    expected = np.nanpercentile(values, [0, 2, 50, 98, 100], axis=(1, 2, 3))
+    # one bin, doubled at most once as the range grows
+    bin_width = 2 * (np.nanmax(values, axis=(1, 2, 3))
+                     - np.nanmin(values, axis=(1, 2, 3))) / 4096
+    assert (np.abs(result - expected) <= 2 * bin_width).all()
+    np.testing.assert_array_equal(result[[0, -1]], expected[[0, -1]])
+
+
+def test_export2vid_uses_global_stretch(tmp_path):
+    """Test that the default contrast is the streamed one of all frames"""
+    _write_parts(tmp_path)
+    bands = ["B04", "B03", "B02"]
+    geo_dc = Sits_ds(str(tmp_path / "fid-1_sat_*.nc"))
+    vmin, vmax = geo_dc.band_percentiles(bands)
+
+    geo_dc.export2vid(str(tmp_path / "auto.gif"), bands)
+    geo_dc.export2vid(str(tmp_path / "given.gif"), bands, vmin=vmin, vmax=vmax)
+
+    np.testing.assert_array_equal(np.stack(imageio.mimread(tmp_path / "auto.gif")),
+                                  np.stack(imageio.mimread(tmp_path / "given.gif")))
+
+
+def test_streaming_histogram_grows():
+    """Test the quantiles of a stream whose range keeps widening"""
+    from sits.export import _StreamingHistogram
+
+    rng = np.random.default_rng(0)
+    parts = [rng.normal(0, scale, 5000) for scale in (0.01, 1.0, 100.0)]
+    hist = _StreamingHistogram(bins=4096)
+    for part in parts:
+        hist.update(part)
+
+    values = np.concatenate(parts)
+    for q in (0.02, 0.5, 0.98):
+        assert abs(hist.quantile(q) - np.quantile(values, q)) <= 2 * hist.width
+
+
+def test_export2vid_colormap_lut(tmp_path):
+    """Test the lookup-table colormapping against the matplotlib colormap"""
+    import matplotlib
+
+    cube = create_synthetic_satellite_cube(width=30, height=20, time_steps=4,
+                                           bands=["B04"]).astype(float)
+    cube.B04[1, :3, :3] = np.nan
+    cube.to_netcdf(tmp_path / "cube.nc")
+
+    Sits_ds(str(tmp_path / "cube.nc")).export2vid(
+        str(tmp_path / "mono.png"), ["B04"], colormap="magma", vmin=300, vmax=2500)
+
+    frames = np.stack(imageio.mimread(tmp_path / "mono.png"))
+    norm = np.clip((cube.B04.values - 300) / 2200, 0, 1)
+    expected = (matplotlib.colormaps["magma"](norm)[..., :3] * 255).astype(np.uint8)
+    np.testing.assert_array_equal(frames, expected)
+
+
+def test_time_interp_needs_distinct_dates(tmp_path):
+    """Test the duplicated and single dates in the time interpolation"""
+    cube = _write_parts(tmp_path).astype(float)
+    geo_dc = Sits_ds()
+    geo_dc.ds = xr.concat([cube, cube.isel(time=[2])], dim="time")
+    geo_dc.time_interp(nb_period=11)
+    assert np.isfinite(geo_dc.ds.B04.values).all()
+
+    geo_dc.ds = cube.isel(time=[0, 0])
+    with pytest.raises(ValueError):
+        geo_dc.time_interp()
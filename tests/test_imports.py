@@ -0,0 +1,76 @@
+"""
+Import-time checks: heavy optional libraries must not be loaded by
+``import sits`` or by the submodules that do not use them, and every
+import must stay within its time budget.
+"""
+
+import subprocess
+import sys
+
+import pytest
+
+HEAVY = ["sktime", "matplotlib", "geogif", "imageio", "spyndex",
+         "planetary_computer", "skimage"]
+
+
+# generous import-time budgets (seconds), which still catch an eager
+# ``import sits`` or a heavy library pulled in by a submodule
+BUDGETS = {
+    "import sits": 0.5,
+    "from sits import sits": 6.0,
+    "from sits import analysis": 4.0,
+    "from sits import export": 4.0,
+    "from sits import smoothing": 4.0,
+    "from sits import layout": 4.0,
+    "from sits import indices": 4.0,
+}
+
+
+def _run_import(statement):
+    """
+    Run an import in a fresh interpreter and return the heavy modules loaded
+    and the import time in seconds.
+    """
+    code = (f"import sys, time\n"
+            f"t0 = time.perf_counter()\n"
+            f"{statement}\n"
+            f"elapsed = time.perf_counter() - t0\n"
+            f"print(','.join(m for m in {HEAVY!r} if m in sys.modules))\n"
+            f"print(elapsed)\n")
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True,
+                            text=True, check=True)
+    modules, elapsed = result.stdout.split("\n")[:2]
+    return [m for m in modules.split(",") if m], float(elapsed)
+
+
+@pytest.mark.parametrize("statement", list(BUDGETS))
+def test_import_does_not_load_heavy_modules(statement):
+    """Test that heavy libraries are only imported when needed"""
+    modules, _ = _run_import(statement)
+    assert modules == []
+
+
+@pytest.mark.parametrize("statement", list(BUDGETS))
+def test_import_time_budget(statement):
+    """Benchmark the import time in a fresh interpreter against its budget"""
+    # best of two runs, to smooth out a cold file cache
+    elapsed = min(_run_import(statement)[1] for _ in range(2))
+    assert elapsed < BUDGETS[statement], f"{statement}: {elapsed:.2f} s"
+
+
+def test_lazy_submodules():
+    """Test the lazy attribute access to the submodules"""
+    import sits
+
+    assert sits.smoothing.smooth is not None
+    assert "analysis" in dir(sits)
+    with pytest.raises(AttributeError):
+        sits.not_a_module
+
+
+def test_analysis_registers_rio_accessor():
+    """Test that sits.analysis works without importing sits.sits first"""
+    code = ("import numpy as np, xarray as xr\n"
+            "from sits.analysis import sieve_maj\n"
+            "sieve_maj(xr.DataArray(np.ones((4, 4)), dims=('y', 'x')))\n")
+    subprocess.run([sys.executable, "-c", code], check=True)
@@ -0,0 +1,38 @@
+"""
+Tests of the pixel-major and date-major cube layouts.
+"""
+
+import numpy as np
+
+from sits import layout  # noqa: F401, registers the accessor
+from test_data import create_mock_stac_object
+
+
+def test_to_pixel_major_roundtrip(tmp_path):
+    """Test the time-contiguous Zarr copy of a date-chunked cube"""
+    cube = create_mock_stac_object().cube.chunk({"time": 1, "x": 10, "y": 10})
+    assert cube.layout.kind == "date"
+
+    copy = cube.layout.export_pixel_major(str(tmp_path / "cube.zarr"), chunk_size=4)
+
+    assert copy.layout.kind == "pixel"
+    assert copy.B04.chunks[0] == (cube.sizes["time"],)
+    assert max(copy.B04.chunks[1]) == 4
+    assert cube.layout.for_pixels() is copy
+    np.testing.assert_array_equal(copy.B04.values, cube.B04.values)
+    np.testing.assert_array_equal(copy.time.values, cube.time.values)
+
+
+def test_accessor_picks_layout():
+    """Test that the accessor rechunks only when needed"""
+    band = create_mock_stac_object().cube.B04
+    assert band.layout.kind is None
+
+    pixels = band.layout.for_pixels(chunk_size=3)
+    assert pixels.layout.kind == "pixel"
+    assert pixels.layout.for_pixels() is pixels
+
+    dates = pixels.layout.for_dates()
+    assert dates.layout.kind == "date"
+    assert dates.layout.for_dates() is dates
+    np.testing.assert_array_equal(dates.values, band.values)
@@ -0,0 +1,122 @@
+"""
+Tests of the temporal smoothers on synthetic time series.
+"""
+
+import numpy as np
+import pytest
+from scipy.signal import savgol_filter
+
+from sits import smoothing
+from test_data import create_mock_stac_object
+
+
+def _noisy_series(n_pixels=6, n_dates=40, seed=0):
+    rng = np.random.default_rng(seed)
+    t = np.arange(n_dates)
+    signal = 0.5 + 0.3 * np.sin(2 * np.pi * t / n_dates)
+    return signal + rng.normal(0, 0.05, (n_pixels, n_dates))
+
+
+def test_whittaker_matches_dense_solution():
+    """Test the batched Whittaker solve against a dense reference"""
+    y = _noisy_series()
+    y[1, [3, 4, 10]] = np.nan
+    y[2, ::2] = np.nan
+    lmbda = 5.0
+
+    out = smoothing.whittaker(y, lmbda=lmbda, d=2)
+
+    D = np.diff(np.eye(y.shape[1]), n=2, axis=0)
+    for row, smoothed in zip(y, out):
+        w = np.isfinite(row).astype(float)
+        ref = np.linalg.solve(np.diag(w) + lmbda * D.T @ D, w * np.nan_to_num(row))
+        np.testing.assert_allclose(smoothed, ref, atol=1e-10)
+
+
+def test_whittaker_too_few_observations():
+    """Test that a series with fewer than d valid dates stays NaN"""
+    y = _noisy_series(n_pixels=2)
+    y[0, 1:] = np.nan
+    out = smoothing.whittaker(y, d=2)
+    assert np.isnan(out[0]).all()
+    assert np.isfinite(out[1]).all()
+
+
+def test_savgol_matches_scipy_without_gaps():
+    """Test the NaN-aware Savitzky-Golay against scipy in the interior"""
+    y = _noisy_series()
+    out = smoothing.savgol(y, window_length=7, polyorder=2)
+    ref = savgol_filter(y, 7, 2, axis=-1)
+    np.testing.assert_allclose(out[:, 3:-3], ref[:, 3:-3], atol=1e-10)
+
+
+def test_rolling_median_is_centred():
+    """Test the centred moving median"""
+    y = np.array([[1.0, 5.0, 2.0, np.nan, 4.0]])
+    out = smoothing.rolling_median(y, window_length=3)
+    np.testing.assert_allclose(out, [[3.0, 2.0, 3.5, 3.0, 4.0]])
+
+
+@pytest.mark.parametrize("method", ["whittaker", "savgol", "rolling_median"])
+def test_smooth_dask_cube(method):
+    """Test the chunk-wise smoothing of a dask-backed cube"""
+    stac_obj = create_mock_stac_object()
+    stac_obj.cube = stac_obj.cube.chunk({"time": 1, "x": 3, "y": 3})
+    expected = smoothing.smooth(stac_obj.cube.compute(), method=method)
+
+    stac_obj.smooth(method=method)
+
+    assert stac_obj.cube.chunks is not None
+    np.testing.assert_allclose(stac_obj.cube.B04.values, expected.B04.values)
+
+
+@pytest.mark.filterwarnings("ignore:All-NaN slice")
+def test_nanquantile_matches_numpy():
+    """Test the vectorized quantile against np.nanquantile"""
+    y = _noisy_series(n_pixels=20)
+    y[np.random.default_rng(1).random(y.shape) < 0.3] = np.nan
+    y[0] = np.nan
+    for q in (0.0, 0.25, 0.5, 0.75, 1.0):
+        ref = np.nanquantile(y, q, axis=-1)
+        np.testing.assert_allclose(smoothing._nanquantile(y, q), ref, atol=1e-12)
+
+
+@pytest.mark.parametrize("method", ["sigma", "iqr", "hampel"])
+def test_outlier_filters_remove_spikes(method):
+    """Test that the outlier filters mask spikes and keep the signal"""
+    y = _noisy_series()
+    y[:, 15] += 2.0
+    y[3, 30] = np.nan
+    out = smoothing.OUTLIER_FILTERS[method](y, value=3.0)
+    assert np.isnan(out[:, 15]).all()
+    kept = np.isfinite(out)
+    assert kept.sum() >= y.size - 2 * len(y)
+    np.testing.assert_array_equal(out[kept], y[kept])
+
+
+def test_hampel_matches_loop():
+    """Test the Hampel despiker against a scalar reference"""
+    y = _noisy_series(n_pixels=3)
+    y[1, [5, 6]] = np.nan
+    y[2, 20] = 3.0
+    out = smoothing.hampel(y, window_length=5, value=2.0)
+    for row, filtered in zip(y, out):
+        for t in range(len(row)):
+            win = row[max(t - 2, 0):t + 3]
+            med = np.nanmedian(win)
+            mad = 1.4826 * np.nanmedian(np.abs(win - med))
+            outlier = abs(row[t] - med) > 2.0 * mad
+            expected = np.nan if outlier else row[t]
+            np.testing.assert_equal(filtered[t], expected)
+
+
+def test_filter_outliers_dask_cube():
+    """Test the chunk-wise outlier filtering of a dask-backed cube"""
+    stac_obj = create_mock_stac_object()
+    stac_obj.cube = stac_obj.cube.chunk({"time": 1, "x": 3, "y": 3})
+    expected = smoothing.filter_outliers(stac_obj.cube.compute(), method="iqr")
+
+    stac_obj.filter_outliers(method="iqr")
+
+    assert stac_obj.cube.chunks is not None
+    np.testing.assert_array_equal(stac_obj.cube.B04.values, expected.B04.values)
@@ -4,6 +4,7 @@ Tests using synthetic data - faster and more reliable than VCR cassettes.
 
 import pytest
 import numpy as np
+import xarray as xr
 import sys
 import os
 
@@ -223,3 +224,111 @@ def test_performance_with_small_synthetic_data():
     elapsed_time = time.time() - start_time
     assert elapsed_time < 1.0  # Should complete in under 1 second
     assert len(mean_values) == 4  # All bands processed
+
+
+@pytest.mark.parametrize("method", ["median", "mean", "max_ndvi", "min_cloud"])
+def test_composite_with_synthetic_data(method):
+    """Test temporal compositing on a regular 10-day grid"""
+    stac_obj = create_mock_stac_object()
+    stac_obj.cube = create_synthetic_satellite_cube(width=4, height=4, time_steps=9)
+    stac_obj.mask_conf()
+    stac_obj.mask_apply()
+
+    stac_obj.composite(freq="30D", method=method)
+
+    assert stac_obj.cube.sizes == {"time": 3, "y": 4, "x": 4}
+    assert stac_obj.mask.sizes == stac_obj.cube.sizes
+    # composite values are observed values (or their summary) of the bin
+    b04 = stac_obj.cube["B04"].values
+    assert np.nanmin(b04) >= 300 and np.nanmax(b04) <= 2500
+
+
+def test_composite_max_ndvi_selects_greenest_date():
+    """Test that max_ndvi keeps the observation with the highest NDVI"""
+    stac_obj = create_mock_stac_object()
+    cube = create_synthetic_satellite_cube(width=3, height=3, time_steps=3)
+    stac_obj.cube = cube
+    ndvi = (cube.B08.astype(float) - cube.B04) / (cube.B08.astype(float) + cube.B04)
+    best = ndvi.argmax("time").values
+
+    stac_obj.composite(freq="30D", method="max_ndvi")
+
+    expected = np.take_along_axis(cube.B04.values, best[None], axis=0)[0]
+    np.testing.assert_array_equal(stac_obj.cube.B04.isel(time=0).values, expected)
+
+
+def test_composite_invalid_method():
+    """Test that an unknown compositing rule is rejected"""
+    stac_obj = create_mock_stac_object()
+    with pytest.raises(ValueError):
+        stac_obj.composite(method="mode")
+
+
+def test_fused_spectral_indices_match_spyndex():
+    """Test the fused engine against spyndex, with constants (EVI)"""
+    stac_obj = create_mock_stac_object()
+    stac_obj.cube["B02"] = stac_obj.cube["B03"]
+    stac_obj.cube = stac_obj.cube.rio.write_crs(3035).chunk({"x": 3})
+    band_mapping = {"B": "B02", "G": "B03", "R": "B04", "N": "B08"}
+    indices = ["NDVI", "GNDVI", "EVI"]
+
+    stac_obj.spectral_index(indices, band_mapping)
+    reference = stac_obj.indices.compute()
+    stac_obj.spectral_index(indices, band_mapping, engine="fused")
+
+    for name in indices:
+        assert stac_obj.indices[name].dtype == np.float32
+        np.testing.assert_allclose(
+            stac_obj.indices[name].values, reference[name].values, rtol=1e-4
+        )
+
+
+@pytest.mark.parametrize("engine", ["spyndex", "fused"])
+def test_scaled_integer_indices_roundtrip(engine, tmp_path):
+    """Test int16 indices with CF attributes decoded back from NetCDF"""
+    stac_obj = create_mock_stac_object()
+    stac_obj.cube = stac_obj.cube.rio.write_crs(3035)
+    stac_obj.cube["B04"][0, 0, 0] = 0
+    stac_obj.cube["B08"][0, 0, 0] = 0
+    band_mapping = {"R": "B04", "N": "B08"}
+
+    stac_obj.spectral_index("NDVI", band_mapping, engine=engine)
+    reference = stac_obj.indices["NDVI"].values
+    stac_obj.spectral_index("NDVI", band_mapping, engine=engine, dtype="int16")
+
+    ndvi = stac_obj.indices["NDVI"]
+    assert ndvi.dtype == np.int16
+    assert ndvi.values[0, 0, 0] == -32768
+
+    # promoted to float by masking, repacked by to_nc
+    stac_obj.indices = stac_obj.indices.where(stac_obj.indices["NDVI"] != 0)
+    stac_obj.to_nc(tmp_path, cube="indices", filename="idx.nc")
+    with xr.open_dataset(tmp_path / "idx.nc", mask_and_scale=False) as raw:
+        assert raw["NDVI"].dtype == np.int16
+    with xr.open_dataset(tmp_path / "idx.nc") as decoded:
+        np.testing.assert_allclose(decoded["NDVI"].values, reference,
+                                   atol=1e-4, equal_nan=True)
+
+
+def test_extract_points_matches_nearest_selection():
+    """Test the vectorized point extraction against per-point selections"""
+    import geopandas as gpd
+
+    stac_obj = create_mock_stac_object()
+    stac_obj.cube = stac_obj.cube.chunk({"time": 1, "x": 4, "y": 4})
+    cube = stac_obj.cube
+    xs = cube.x.values[[0, 3, 8]] + [2.0, -3.0, 1.0]
+    ys = cube.y.values[[5, 1, 8]] + [-1.0, 4.0, 0.0]
+    gdf = gpd.GeoDataFrame({"gid": ["a", "b", "c"]},
+                           geometry=gpd.points_from_xy(xs, ys), crs=3035)
+
+    samples = stac_obj.extract_points(gdf, id_column="gid")
+
+    assert samples.dims == ("point", "time", "band")
+    assert list(samples.point.values) == ["a", "b", "c"]
+    for k, (x, y) in enumerate(zip(xs, ys)):
+        expected = cube.sel(x=x, y=y, method="nearest").to_array("band")
+        np.testing.assert_array_equal(samples.values[k], expected.values.T)
+
+    far = stac_obj.extract_points(np.array([[xs[0], ys[0]], [0.0, 0.0]]), tolerance=5)
+    assert np.isfinite(far.values[0]).all() and np.isnan(far.values[1]).all()